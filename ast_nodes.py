@@ -1,32 +1,50 @@
 from dataclasses import dataclass
-from typing import List, Any, Optional
+from typing import List, Any, Optional, Tuple
+
+class Node:
+    # Source position (1-based) of the form, set by the parser when known.
+    # Plain class attributes rather than dataclass fields, so equality and repr ignore them.
+    line = None
+    column = None
+
+def with_pos(node, src):
+    """Copies the source position of `src` (a Node, Lark Token or Meta) onto `node`."""
+    line = getattr(src, 'line', None)
+    if line is not None and isinstance(node, Node):
+        node.line = line
+        node.column = getattr(src, 'column', None)
+    return node
 
 @dataclass
-class Symbol:
+class Symbol(Node):
     name: str
     def __repr__(self):
         return f"{self.name}"
 
 @dataclass
-class LispList:
+class LispList(Node):
     elements: List[Any]
+    # Final cdr of dotted quoted data such as (a b . c); None for a proper list
+    tail: Optional[Any] = None
     def __repr__(self):
+        if self.tail is not None:
+            return f"({' '.join(map(str, self.elements))} . {self.tail})"
         return f"({' '.join(map(str, self.elements))})"
 
 @dataclass
-class Number:
+class Number(Node):
     value: float | int
     def __repr__(self):
         return str(self.value)
 
 @dataclass
-class String:
+class String(Node):
     value: str
     def __repr__(self):
         return f'"{self.value}"'
 
 @dataclass
-class Bool:
+class Bool(Node):
     value: bool
     def __repr__(self):
         return "#t" if self.value else "#f"
@@ -38,25 +56,57 @@ class Bool:
 # Given the user wants a compiler, structural nodes are better.
 
 @dataclass
-class Program:
+class Program(Node):
     expressions: List[Any]
 
 @dataclass
-class Define:
+class Define(Node):
     target: Symbol
     value: Any
+    # Name in the source of a local function the LambdaLifter moved to the top
+    # level under a generated name; None for definitions written at the top level.
+    source_name = None
 
 @dataclass
-class If:
+class If(Node):
     test: Any
     consequent: Any
     alternate: Optional[Any] = None
 
 @dataclass
-class Lambda:
+class Lambda(Node):
     params: List[Symbol]
     body: List[Any]
 
 @dataclass
-class Quote:
+class Quote(Node):
     datum: Any
+
+# Binding forms. `bindings` is a list of (Symbol, init) pairs; `name` is set for named let.
+@dataclass
+class Let(Node):
+    bindings: List[Tuple[Symbol, Any]]
+    body: List[Any]
+    name: Optional[Symbol] = None
+
+@dataclass
+class LetStar(Node):
+    bindings: List[Tuple[Symbol, Any]]
+    body: List[Any]
+
+@dataclass
+class Letrec(Node):
+    bindings: List[Tuple[Symbol, Any]]
+    body: List[Any]
+
+@dataclass
+class Begin(Node):
+    body: List[Any]
+
+@dataclass
+class Do(Node):
+    # specs: list of (variable, init, step-or-None)
+    specs: List[Tuple[Symbol, Any, Optional[Any]]]
+    test: Any
+    result: List[Any]
+    commands: List[Any]
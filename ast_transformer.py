@@ -1,4 +1,5 @@
-from lark import Transformer, v_args
+import re
+from lark import Transformer, Token, v_args
 from ast_nodes import *
 
 class LispTransformer(Transformer):
@@ -8,7 +9,11 @@ class LispTransformer(Transformer):
     def program(self, items):
         return Program(items)
 
-    def definition(self, items):
+    @v_args(meta=True)
+    def definition(self, meta, items):
+        return with_pos(self._definition(items), meta)
+
+    def _definition(self, items):
         # definition: "(" "define" variable expression ")"
         #           | "(" "define" "(" variable def_formals ")" body ")"
         # grammar rules have different structures, we need to handle them.
@@ -61,8 +66,14 @@ class LispTransformer(Transformer):
 
     def body(self, items):
         # definition* sequence
-        # Flatten
-        return items 
+        # Flatten: definitions come first, the sequence arrives as a list.
+        flat = []
+        for item in items:
+            if isinstance(item, list):
+                flat.extend(item)
+            else:
+                flat.append(item)
+        return flat
 
     def sequence(self, items):
         # command* expression
@@ -79,23 +90,31 @@ class LispTransformer(Transformer):
         return items[0]
 
     def identifier(self, items):
-        return Symbol(str(items[0]))
+        return with_pos(Symbol(str(items[0])), items[0])
     
     def symbol(self, items):
         return items[0]
 
     # --- Literals ---
     def number(self, items):
-        return Number(float(items[0]) if '.' in items[0] else int(items[0]))
+        text = str(items[0])
+        return Number(float(text) if '.' in text or 'e' in text.lower() else int(text))
+
+    STRING_ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
 
     def string(self, items):
-        # Remove quotes
-        return String(items[0][1:-1])
+        # Remove quotes and decode escapes
+        text = items[0][1:-1]
+        return String(re.sub(r'\\(.)', lambda m: self.STRING_ESCAPES.get(m.group(1), m.group(1)), text))
 
     def boolean(self, items):
-        return Bool(items[0] == "#t")
+        return Bool(items[0].lower() == "#t")
 
-    def procedure_call(self, items):
+    @v_args(meta=True)
+    def procedure_call(self, meta, items):
+        return with_pos(self._procedure_call(items), meta)
+
+    def _procedure_call(self, items):
         # (operator operand*)
         # items[0] is operator, items[1:] are operands
         op = items[0]
@@ -136,11 +155,111 @@ class LispTransformer(Transformer):
                  alternate = items[3] if len(items) > 3 else None
                  return If(test, consequent, alternate)
 
+        # Handle lambda: (lambda (params) body...)
+        if isinstance(op, Symbol) and op.name == "lambda":
+            if len(items) >= 3 and isinstance(items[1], LispList):
+                return Lambda(items[1].elements, items[2:])
+
+        # Handle binding forms (let, let*, letrec, begin, do) parsed as calls
+        if isinstance(op, Symbol) and op.name in self.BINDING_FORMS:
+            node = self._binding_form(op.name, items[1:])
+            if node is not None:
+                return node
+
         return LispList(items)
 
-    def lambda_expression(self, items):
+    BINDING_FORMS = {"let", "let*", "letrec", "begin", "do"}
+
+    def _binding_form(self, keyword, args):
+        # Rebuild a binding form from its generic list structure.
+        # Returns None if the shape does not match, so the caller keeps the call.
+        def pairs(spec):
+            if not isinstance(spec, LispList):
+                return None
+            out = []
+            for b in spec.elements:
+                if not (isinstance(b, LispList) and b.elements and isinstance(b.elements[0], Symbol)):
+                    return None
+                out.append(b.elements)
+            return out
+
+        if keyword == "begin":
+            return Begin(list(args))
+
+        if keyword == "do":
+            if len(args) < 2:
+                return None
+            specs = pairs(args[0])
+            clause = args[1]
+            if specs is None or not isinstance(clause, LispList) or not clause.elements:
+                return None
+            specs = [(s[0], s[1], s[2] if len(s) > 2 else None) for s in specs]
+            return Do(specs, clause.elements[0], clause.elements[1:], list(args[2:]))
+
+        # let / let* / letrec
+        name = None
+        if keyword == "let" and args and isinstance(args[0], Symbol):
+            name, args = args[0], args[1:]
+        if not args:
+            return None
+        bindings = pairs(args[0])
+        if bindings is None:
+            return None
+        bindings = [(b[0], b[1]) for b in bindings]
+        body = list(args[1:])
+        if keyword == "let":
+            return Let(bindings, body, name)
+        if keyword == "let*":
+            return LetStar(bindings, body)
+        return Letrec(bindings, body)
+
+    @v_args(meta=True)
+    def derived_expression(self, meta, items):
+        return with_pos(self._derived_expression(items), meta)
+
+    def _derived_expression(self, items):
+        # Only the keyword-tagged forms are lowered; cond/case/and/or/delay are not yet.
+        keyword = items[0]
+        if not isinstance(keyword, Token):
+            return items
+        rest = items[1:]
+        if keyword.type == "BEGIN":
+            return Begin(rest[0])
+        if keyword.type == "DO":
+            specs = [s for s in rest if isinstance(s, tuple)]
+            rest = rest[len(specs):]
+            test = rest[0]
+            result = rest[1] if len(rest) > 1 and isinstance(rest[1], list) else []
+            commands = rest[2:] if result else rest[1:]
+            return Do(specs, test, result, commands)
+
+        # let / let* / letrec: optional name, binding_spec*, body
+        name = None
+        if rest and isinstance(rest[0], Symbol):
+            name, rest = rest[0], rest[1:]
+            # A name glued to the keyword means the lexer split a longer keyword
+            if keyword.type != "LET" or (name.line, name.column) == (keyword.end_line, keyword.end_column):
+                raise Exception(f"Malformed {keyword}{name.name}: not a named let")
+        bindings = rest[:-1]
+        body = rest[-1]
+        if keyword.type == "LET":
+            return Let(bindings, body, name)
+        if keyword.type == "LET_STAR":
+            return LetStar(bindings, body)
+        return Letrec(bindings, body)
+
+    def binding_spec(self, items):
+        # (variable expression)
+        return (items[0], items[1])
+
+    def iteration_spec(self, items):
+        # (variable init step?)
+        return (items[0], items[1], items[2] if len(items) > 2 else None)
+
+    @v_args(meta=True)
+    def lambda_expression(self, meta, items):
         # (lambda formals body)
-        return Lambda(items[0], items[1])
+        return with_pos(Lambda(items[0], items[1]), meta)
     
     def formals(self, items):
         # "(" variable* ")" ...
@@ -164,8 +283,12 @@ class LispTransformer(Transformer):
         return items[0]
         
     # --- Lists ---
-    def list(self, items):
-        return LispList(items)
+    @v_args(meta=True)
+    def list(self, meta, items):
+        # (datum+ . datum): the DOT token separates the elements from the tail
+        if len(items) >= 3 and isinstance(items[-2], Token) and items[-2].type == "DOT":
+            return with_pos(LispList(items[:-2], items[-1]), meta)
+        return with_pos(LispList(items), meta)
         
     def quote(self, items):
         return Quote(items[0])
@@ -175,9 +298,10 @@ class LispTransformer(Transformer):
 
     # Handling 'if' explicitly if desired, but in `expression` it falls through to generic rules often?
     # In `lisp.lark` conditional is a rule.
-    def conditional(self, items):
+    @v_args(meta=True)
+    def conditional(self, meta, items):
         # (if test consequent alternate?)
         if len(items) == 2:
-             return If(items[0], items[1])
-        return If(items[0], items[1], items[2])
+             return with_pos(If(items[0], items[1]), meta)
+        return with_pos(If(items[0], items[1], items[2]), meta)
 
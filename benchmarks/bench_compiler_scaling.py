@@ -0,0 +1,199 @@
+"""
+Compiler throughput scaling benchmark.
+
+Generates synthetic programs (see program_generator.py), sweeping one
+parameter at a time, and times every compiler stage: Lark parse,
+LispTransformer, LambdaLifter, TreeShaker, CodeGen, LLVM optimization and
+LLVM object emission. For each stage it fits time ~ size^k on a log-log
+scale (size = source bytes) and flags stages with k above the threshold.
+
+Results are written to benchmarks/results/<commit>.json so runs can be
+compared across commits. The Earley parser dominates wall time (about 1.5 ms
+per source byte), so the base program is kept small.
+
+Usage (from the repository root):
+    python benchmarks/bench_compiler_scaling.py [--quick] [--repeat N] [--axis AXIS]
+    python benchmarks/bench_compiler_scaling.py --compare benchmarks/results/<commit>.json
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+
+import llvmlite.binding as llvm
+from main import load_parser
+from ast_transformer import LispTransformer
+from lambda_lifter import LambdaLifter
+from tree_shaker import TreeShaker
+from codegen import CodeGen
+from program_generator import generate_program
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+STAGES = ["parse", "transform", "lift", "shake", "codegen", "llvm_opt", "llvm_emit"]
+
+BASE = {"defines": 4, "depth": 1, "expr_size": 4, "helpers": 1}
+
+# axis -> values swept while the other parameters stay at BASE
+SWEEPS = {
+    "defines": [4, 8, 16, 32, 64],
+    "depth": [1, 2, 4, 8, 16],
+    "expr_size": [4, 8, 16, 32, 64],
+    "helpers": [1, 2, 4, 8, 16],
+}
+
+QUICK_SWEEPS = {axis: values[:3] for axis, values in SWEEPS.items()}
+
+SUPERLINEAR = 1.25
+
+def time_stages(code, parser, target_machine):
+    times = {}
+
+    def timed(stage, fn, *args):
+        # Keep collector pauses out of individual stage timings
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = fn(*args)
+            times[stage] = time.perf_counter() - start
+        finally:
+            gc.enable()
+        return result
+
+    tree = timed("parse", parser.parse, code)
+    ast = timed("transform", LispTransformer().transform, tree)
+    ast = timed("lift", LambdaLifter().lift, ast)
+    ast = timed("shake", TreeShaker().shake, ast)
+    llvm_ir = timed("codegen", CodeGen().generate, ast)
+
+    def optimize():
+        mod = llvm.parse_assembly(llvm_ir)
+        mod.verify()
+        pto = llvm.create_pipeline_tuning_options(speed_level=2)
+        pass_builder = llvm.create_pass_builder(target_machine, pto)
+        pass_builder.getModulePassManager().run(mod, pass_builder)
+        return mod
+
+    mod = timed("llvm_opt", optimize)
+    timed("llvm_emit", target_machine.emit_object, mod)
+    return times
+
+def fit_exponent(sizes, times):
+    # Least-squares slope of log(time) against log(size)
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    var = sum((x - mean_x) ** 2 for x in xs)
+    if var == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+def run(sweeps, repeat):
+    sys.setrecursionlimit(20000)
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+    target_machine = llvm.Target.from_default_triple().create_target_machine()
+    parser = load_parser()
+    # Warm-up: first-call costs (imports, LLVM initialization) are not throughput
+    time_stages(generate_program(**BASE), parser, target_machine)
+
+    results = {}
+    for axis, values in sweeps.items():
+        points = []
+        for value in values:
+            params = dict(BASE, **{axis: value})
+            code = generate_program(**params)
+            best = None
+            for _ in range(repeat):
+                times = time_stages(code, parser, target_machine)
+                best = times if best is None else {s: min(best[s], times[s]) for s in STAGES}
+            points.append({"value": value, "params": params, "source_bytes": len(code), "stages": best})
+        sizes = [p["source_bytes"] for p in points]
+        exponents = {s: fit_exponent(sizes, [p["stages"][s] for p in points]) for s in STAGES}
+        results[axis] = {"points": points, "exponents": exponents}
+    return results
+
+def report(results):
+    for axis, data in results.items():
+        print(f"\nSweep over {axis} (others: {BASE})")
+        header = f"  {axis:>10} {'bytes':>8} " + " ".join(f"{s:>10}" for s in STAGES)
+        print(header)
+        for p in data["points"]:
+            row = " ".join(f"{p['stages'][s] * 1000:8.1f}ms" for s in STAGES)
+            print(f"  {p['value']:>10} {p['source_bytes']:>8} {row}")
+        fits = " ".join(f"{data['exponents'][s]:>10.2f}" for s in STAGES)
+        print(f"  {'k (fit)':>19} {fits}")
+        flagged = [s for s in STAGES if data["exponents"][s] > SUPERLINEAR]
+        if flagged:
+            print(f"  SUPER-LINEAR (k > {SUPERLINEAR}): {', '.join(flagged)}")
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparison against {baseline.get('commit')} ({baseline_path})")
+    for axis, data in results.items():
+        old = baseline["axes"].get(axis)
+        if not old:
+            continue
+        last, old_last = data["points"][-1], old["points"][-1]
+        print(f"  {axis}:")
+        for s in STAGES:
+            ratio = last["stages"][s] / max(old_last["stages"][s], 1e-9)
+            print(f"    {s:>10}: k {old['exponents'][s]:5.2f} -> {data['exponents'][s]:5.2f}, "
+                  f"largest size {ratio:5.2f}x time")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--quick", action="store_true", help="three sizes per axis")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per size (best is kept)")
+    ap.add_argument("--axis", choices=list(SWEEPS), action="append", help="only sweep these axes")
+    ap.add_argument("--compare", metavar="RESULTS_JSON", help="compare with a previous run")
+    ap.add_argument("--no-save", action="store_true", help="do not write a results file")
+    args = ap.parse_args()
+
+    sweeps = QUICK_SWEEPS if args.quick else SWEEPS
+    if args.axis:
+        sweeps = {axis: sweeps[axis] for axis in args.axis}
+
+    results = run(sweeps, args.repeat)
+    report(results)
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if not args.no_save:
+        commit = git_commit()
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{commit}.json")
+        with open(path, "w") as f:
+            json.dump({
+                "commit": commit,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "base": BASE,
+                "axes": results,
+            }, f, indent=2)
+        print(f"\nResults saved to {os.path.relpath(path, ROOT)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Hash table benchmarks: insert/lookup throughput and memory per entry.
+
+Two levels are measured:
+  * the C runtime (runtime/hash_table.c) driven directly from C, for fixnum
+    and string keys, with bytes per entry taken from the table's capacity;
+    std::unordered_map is timed alongside as a reference when g++ is found;
+  * compiled Scheme programs doing the same fixnum workload end to end
+    (inline hashing + runtime calls), against the same loop without a table.
+
+Usage (from the repository root):
+    python benchmarks/bench_hash_tables.py [runs]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from main import load_parser, compile_to_ir, build_executable, RUNTIME_DIR, RUNTIME_SOURCES
+
+SIZES = [1_000, 100_000, 1_000_000, 4_000_000]
+
+# Keys are shuffled so they are not inserted in order; misses use absent keys
+C_DRIVER = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include "scheme.h"
+
+static double now(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+static scm_obj make_string(long n) {
+    char buf[32];
+    int len = snprintf(buf, sizeof buf, "key-%ld", n);
+    scm_string *s = scm_alloc(sizeof(scm_string) + len + 1);
+    s->type = SCM_STRING;
+    s->length = len;
+    memcpy(s->data, buf, len + 1);
+    return SCM_FROM_HEAP(s);
+}
+
+static void run(const char *label, long n, scm_obj *keys, scm_obj *missing) {
+    scm_obj t = scm_make_hash_table();
+    double start = now();
+    for (long i = 0; i < n; i++)
+        scm_hash_table_set(t, keys[i], scm_hash(keys[i]), SCM_MAKE_FIXNUM(i));
+    double insert = now() - start;
+
+    long found = 0;
+    start = now();
+    for (long i = 0; i < n; i++)
+        found += scm_hash_table_ref_default(t, keys[i], scm_hash(keys[i]), SCM_FALSE) != SCM_FALSE;
+    double hit = now() - start;
+
+    start = now();
+    for (long i = 0; i < n; i++)
+        found += scm_hash_table_ref_default(t, missing[i], scm_hash(missing[i]), SCM_FALSE) != SCM_FALSE;
+    double miss = now() - start;
+
+    scm_hash_table *h = (scm_hash_table *)SCM_HEAP(t);
+    double bytes = sizeof(scm_hash_table) + h->capacity * (double)sizeof(scm_hash_entry);
+    if (found != n)
+        scm_error("benchmark: wrong lookup count", SCM_MAKE_FIXNUM(found));
+    printf("%s %ld %.1f %.1f %.1f %.1f %.2f\n", label, n,
+           insert * 1e9 / n, hit * 1e9 / n, miss * 1e9 / n, bytes / n, (double)h->count / h->capacity);
+}
+
+int main(int argc, char **argv) {
+    long n = atol(argv[1]);
+    scm_obj *keys = malloc(n * sizeof(scm_obj)), *missing = malloc(n * sizeof(scm_obj));
+    for (long i = 0; i < n; i++) {
+        keys[i] = SCM_MAKE_FIXNUM(i * 4);
+        missing[i] = SCM_MAKE_FIXNUM(-1 - i);
+    }
+    for (long i = n - 1; i > 0; i--) {
+        long j = (long)((unsigned long)(i * 2654435761UL) % (unsigned long)(i + 1));
+        scm_obj tmp = keys[i]; keys[i] = keys[j]; keys[j] = tmp;
+    }
+    run("fixnum", n, keys, missing);
+
+    for (long i = 0; i < n; i++) {
+        keys[i] = make_string(i);
+        missing[i] = make_string(-1 - i);
+    }
+    run("string", n, keys, missing);
+    return 0;
+}
+"""
+
+CPP_REFERENCE = r"""
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <unordered_map>
+#include <vector>
+#include <algorithm>
+
+int main(int argc, char **argv) {
+    long n = atol(argv[1]);
+    std::vector<long> keys(n);
+    for (long i = 0; i < n; i++) keys[i] = i * 4;
+    for (long i = n - 1; i > 0; i--) std::swap(keys[i], keys[(unsigned long)(i * 2654435761UL) % (unsigned long)(i + 1)]);
+    auto now = [] { return std::chrono::duration<double>(std::chrono::steady_clock::now().time_since_epoch()).count(); };
+    std::unordered_map<long, long> t;
+    double start = now();
+    for (long i = 0; i < n; i++) t[keys[i]] = i;
+    double insert = now() - start;
+    long found = 0;
+    start = now();
+    for (long i = 0; i < n; i++) found += t.count(keys[i]);
+    double hit = now() - start;
+    start = now();
+    for (long i = 0; i < n; i++) found += t.count(-1 - i);
+    double miss = now() - start;
+    printf("fixnum %ld %.1f %.1f %.1f %ld\n", n, insert * 1e9 / n, hit * 1e9 / n, miss * 1e9 / n, found);
+    return 0;
+}
+"""
+
+# Scheme workload: insert n fixnum keys, then look each one up and sum the values
+SCHEME_TABLE = """
+(define (bench n)
+  (let ((t (make-hash-table)))
+    (do ((i 0 (+ i 1))) ((= i n))
+      (hash-table-set! t (* i 4) i))
+    (do ((i 0 (+ i 1))
+         (acc 0 (+ acc (hash-table-ref t (* i 4)))))
+        ((= i n) acc))))
+(bench {n})
+"""
+
+# The same loops without the table, to subtract loop and startup overhead
+SCHEME_BASELINE = """
+(define (bench n)
+  (do ((i 0 (+ i 1))) ((= i n))
+    (* i 4))
+  (do ((i 0 (+ i 1))
+       (acc 0 (+ acc i)))
+      ((= i n) acc)))
+(bench {n})
+"""
+
+def best_time(cmd, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def best_output(cmd, runs):
+    # Lowest timings over several runs of a driver printing one row per key type
+    best = {}
+    for _ in range(runs):
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        for line in out.splitlines():
+            label, n, *values = line.split()
+            values = [float(v) for v in values]
+            prev = best.get(label)
+            best[label] = values if prev is None else [min(a, b) for a, b in zip(prev, values)]
+    return best
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    parser = load_parser()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        driver_src = os.path.join(tmp, "driver.c")
+        with open(driver_src, "w") as f:
+            f.write(C_DRIVER)
+        driver = os.path.join(tmp, "driver")
+        runtime = [os.path.join(RUNTIME_DIR, src) for src in RUNTIME_SOURCES]
+        subprocess.run(["gcc", "-O2", "-I", RUNTIME_DIR, driver_src, *runtime, "-o", driver, "-lm"], check=True)
+
+        cpp = None
+        if shutil.which("g++"):
+            cpp_src = os.path.join(tmp, "reference.cpp")
+            with open(cpp_src, "w") as f:
+                f.write(CPP_REFERENCE)
+            cpp = os.path.join(tmp, "reference")
+            subprocess.run(["g++", "-O2", cpp_src, "-o", cpp], check=True)
+
+        print("Runtime (ns/op; bytes per entry include empty slots)")
+        print(f"  {'keys':>8} {'n':>9} {'insert':>8} {'hit':>8} {'miss':>8} {'B/entry':>8} {'load':>6}")
+        for n in SIZES:
+            rows = best_output([driver, str(n)], runs)
+            for label, (insert, hit, miss, per_entry, load) in rows.items():
+                print(f"  {label:>8} {n:>9} {insert:8.1f} {hit:8.1f} {miss:8.1f} {per_entry:8.1f} {load:6.2f}")
+            if cpp:
+                insert, hit, miss, _ = best_output([cpp, str(n)], runs)["fixnum"]
+                print(f"  {'std::um':>8} {n:>9} {insert:8.1f} {hit:8.1f} {miss:8.1f}")
+
+        print("\nCompiled Scheme, fixnum keys (insert + lookup, ns per key)")
+        for n in SIZES:
+            exe_table = os.path.join(tmp, f"table_{n}")
+            exe_base = os.path.join(tmp, f"base_{n}")
+            build_executable(compile_to_ir(SCHEME_TABLE.format(n=n), parser), exe_table)
+            build_executable(compile_to_ir(SCHEME_BASELINE.format(n=n), parser), exe_base)
+            with_table = best_time([exe_table], runs)
+            baseline = best_time([exe_base], runs)
+            print(f"  {n:>9}: {with_table * 1000:8.1f} ms total, "
+                  f"{(with_table - baseline) * 1e9 / n:6.1f} ns/key over the plain loop")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Exact integer benchmarks: fixnum-only loops and large factorials (bignums).
+
+Each workload is timed as a compiled executable. The fixnum loop is compared
+against the same loop in C (gcc -O2); every workload is also run on other
+Scheme implementations found on PATH (Chez, Chicken, Guile, Racket, Gambit).
+
+Usage (from the repository root):
+    python benchmarks/bench_integers.py [runs]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from main import load_parser, compile_to_ir, build_executable
+
+# name -> (definitions, expression whose value is printed)
+WORKLOADS = {
+    "fixnum loop": ("""
+(define (suma n)
+  (let loop ((i 0) (acc 0))
+    (if (> i n) acc (loop (+ i 1) (+ acc i)))))
+""", "(suma 500000000)"),
+    "fib 32": ("""
+(define (fib n)
+  (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2)))))
+""", "(fib 32)"),
+    "factorial 5000": ("""
+(define (factorial n)
+  (do ((i 1 (+ i 1))
+       (acc 1 (* acc i)))
+      ((> i n) acc)))
+""", "(factorial 5000)"),
+    "factorial 20000": ("""
+(define (factorial n)
+  (do ((i 1 (+ i 1))
+       (acc 1 (* acc i)))
+      ((> i n) acc)))
+""", "(factorial 20000)"),
+}
+
+C_REFERENCE = {
+    "fixnum loop": """
+#include <stdio.h>
+#include <stdlib.h>
+int main(int argc, char **argv) {
+    long n = argc > 1 ? atol(argv[1]) : 500000000, acc = 0;
+    for (long i = 0; i <= n; i++) acc += i;
+    printf("%ld\\n", acc);
+    return 0;
+}
+""",
+}
+
+# Other Schemes: (executable, command builder taking the source path)
+OTHER_SCHEMES = [
+    ("scheme", lambda src: ["scheme", "--script", src]),    # Chez
+    ("csi", lambda src: ["csi", "-script", src]),            # Chicken (interpreter)
+    ("guile", lambda src: ["guile", "--no-auto-compile", src]),
+    ("racket", lambda src: ["racket", "-f", src]),
+    ("gsi", lambda src: ["gsi", src]),                       # Gambit
+]
+
+def best_time(cmd, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    parser = load_parser()
+    others = [(name, build) for name, build in OTHER_SCHEMES if shutil.which(name)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, (defs, expr) in WORKLOADS.items():
+            key = label.replace(" ", "_")
+            exe = os.path.join(tmp, key)
+            build_executable(compile_to_ir(defs + expr, parser), exe)
+            print(f"{label}:")
+            print(f"  {'this compiler':>14}: {best_time([exe], runs) * 1000:9.1f} ms")
+
+            if label in C_REFERENCE:
+                c_src = os.path.join(tmp, key + ".c")
+                with open(c_src, "w") as f:
+                    f.write(C_REFERENCE[label])
+                subprocess.run(["gcc", "-O2", c_src, "-o", exe + "_c"], check=True)
+                print(f"  {'C (gcc -O2)':>14}: {best_time([exe + '_c'], runs) * 1000:9.1f} ms")
+
+            scm_src = os.path.join(tmp, key + ".scm")
+            with open(scm_src, "w") as f:
+                f.write(f"{defs}\n(display {expr})\n(newline)\n")
+            for name, build in others:
+                print(f"  {name:>14}: {best_time(build(scm_src), runs) * 1000:9.1f} ms")
+
+    if not others:
+        print("(no other Scheme implementation found on PATH)")
+
+if __name__ == "__main__":
+    main()
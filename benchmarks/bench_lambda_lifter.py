@@ -0,0 +1,91 @@
+"""
+Scaling benchmark for LambdaLifter over nesting depth and number of nested helpers.
+
+Programs are built directly as ASTs (parsing is not measured). Each level of
+nesting defines `helpers` sibling functions that use the parameters of every
+enclosing level, so all of them must be captured.
+
+Usage (from the repository root):
+    python benchmarks/bench_lambda_lifter.py
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ast_nodes import *
+from lambda_lifter import LambdaLifter
+
+def nested_program(depth, helpers):
+    # (define (f0 p0) (define (f1_0 p1) ...) ... (f1_0 p0))
+    def level(d):
+        param = Symbol(f"p{d}")
+        body = []
+        if d < depth:
+            for h in range(helpers):
+                lam = level(d + 1)
+                body.append(Define(Symbol(f"f{d + 1}_{h}"), lam))
+            # Use every enclosing parameter, then call the first helper.
+            total = param
+            for outer in range(d):
+                total = LispList([Symbol("+"), total, Symbol(f"p{outer}")])
+            body.append(LispList([Symbol(f"f{d + 1}_0"), total]))
+        else:
+            body.append(LispList([Symbol("+"), param, Symbol("p0")]))
+        return Lambda([param], body)
+
+    return Program([Define(Symbol("f0"), level(0)), LispList([Symbol("f0"), Number(1)])])
+
+def count_nodes(node):
+    if isinstance(node, Program):
+        return 1 + sum(count_nodes(e) for e in node.expressions)
+    if isinstance(node, Define):
+        return 1 + count_nodes(node.value)
+    if isinstance(node, Lambda):
+        return 1 + len(node.params) + sum(count_nodes(e) for e in node.body)
+    if isinstance(node, LispList):
+        return 1 + sum(count_nodes(e) for e in node.elements)
+    return 1
+
+def time_lift(program, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        LambdaLifter().lift(program)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def report(title, label, points):
+    print(title)
+    prev = None
+    for x, (n_funcs, n_nodes, elapsed) in points:
+        ratio = f"{elapsed / prev:5.2f}x" if prev else "     -"
+        per_node = elapsed / n_nodes * 1e6
+        print(f"  {label}={x:<5} functions={n_funcs:<6} nodes={n_nodes:<7} "
+              f"{elapsed * 1000:9.2f} ms  {ratio}  {per_node:5.2f} us/node")
+        prev = elapsed
+
+def main():
+    sys.setrecursionlimit(20000)
+
+    # Depth scaling: one helper per level. Program size grows quadratically with
+    # depth (each level adds up all enclosing params), so compare us/node.
+    points = []
+    for depth in (16, 32, 64, 128, 256):
+        program = nested_program(depth, 1)
+        points.append((depth, (depth + 1, count_nodes(program), time_lift(program))))
+    report("Nesting depth (1 helper per level):", "depth", points)
+
+    # Helper count scaling: two levels, many siblings per level
+    points = []
+    for helpers in (4, 8, 16, 32, 64):
+        n_funcs = 1 + helpers + helpers * helpers
+        program = nested_program(2, helpers)
+        points.append((helpers, (n_funcs, count_nodes(program), time_lift(program))))
+    report("Sibling helpers (depth 2):", "helpers", points)
+
+if __name__ == "__main__":
+    main()
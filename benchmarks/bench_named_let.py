@@ -0,0 +1,54 @@
+"""
+Compares a named-let loop against the equivalent lifted recursive helper.
+
+Both programs compute the same sum; the only difference is whether the inner
+iteration is lowered to a native loop or to a call to a lifted function.
+
+Usage (from the repository root):
+    python benchmarks/bench_named_let.py [runs]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from main import load_parser, compile_to_ir, build_executable
+
+PROGRAMS = {
+    "named let": "benchmarks/named_let_loop.scm",
+    "lifted helper": "benchmarks/lifted_helper.scm",
+}
+
+def best_time(exe, runs):
+    best = None
+    output = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([exe], capture_output=True, text=True, check=True).stdout
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.strip()
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    parser = load_parser()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, path in PROGRAMS.items():
+            with open(path) as f:
+                llvm_ir = compile_to_ir(f.read(), parser)
+            exe = os.path.join(tmp, label.replace(" ", "_"))
+            build_executable(llvm_ir, exe)
+            results[label] = best_time(exe, runs)
+
+    base = results["lifted helper"][0]
+    for label, (elapsed, output) in results.items():
+        print(f"{label:>14}: {elapsed * 1000:8.1f} ms  ({base / elapsed:4.2f}x)  {output}")
+
+if __name__ == "__main__":
+    main()
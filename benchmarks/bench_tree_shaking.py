@@ -0,0 +1,71 @@
+"""
+Measures the effect of tree shaking on a program that uses a few functions
+from a large prelude: CodeGen time, LLVM object emission time and object size.
+
+Usage (from the repository root):
+    python benchmarks/bench_tree_shaking.py [prelude_size]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import llvmlite.binding as llvm
+from main import load_parser
+from ast_transformer import LispTransformer
+from lambda_lifter import LambdaLifter
+from tree_shaker import TreeShaker
+from codegen import CodeGen
+
+def prelude(size):
+    # Each prelude function has a nested helper, so lifting doubles the count.
+    lines = []
+    for i in range(size):
+        lines.append(
+            f"(define (prelude-{i} n)"
+            f" (define (aux k) (if (< k 1) {i} (aux (- k 1))))"
+            f" (+ (aux n) (prelude-{max(i - 1, 0)} 0)))"
+        )
+    return "\n".join(lines)
+
+def measure(ast, shake):
+    if shake:
+        ast = TreeShaker().shake(ast)
+    start = time.perf_counter()
+    llvm_ir = CodeGen().generate(ast)
+    codegen_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    target_machine = llvm.Target.from_default_triple().create_target_machine()
+    mod = llvm.parse_assembly(llvm_ir)
+    mod.verify()
+    obj = target_machine.emit_object(mod)
+    llvm_time = time.perf_counter() - start
+    return codegen_time, llvm_time, len(obj)
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    code = prelude(size) + "\n(prelude-3 2)\n"
+    tree = load_parser().parse(code)
+
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    print(f"Prelude of {size} functions, program uses prelude-0..3")
+    rows = {}
+    for label, shake in (("no shaking", False), ("tree shaking", True)):
+        ast = LambdaLifter().lift(LispTransformer().transform(tree))
+        rows[label] = measure(ast, shake)
+        codegen_time, llvm_time, obj_size = rows[label]
+        print(f"  {label:>12}: codegen {codegen_time * 1000:8.1f} ms  "
+              f"llvm {llvm_time * 1000:8.1f} ms  object {obj_size:>8} bytes")
+
+    shaker = TreeShaker()
+    shaker.shake(LambdaLifter().lift(LispTransformer().transform(tree)))
+    print(f"  removed {len(shaker.removed)} definitions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+;;; Suma 0..n con una función auxiliar anidada (elevada por LambdaLifter).
+
+(define (suma n)
+  (define (iter i acc)
+    (if (> i n)
+        acc
+        (iter (+ i 1) (+ acc i))))
+  (iter 0 0))
+
+(define (repetir veces n)
+  (do ((r 0 (+ r 1))
+       (total 0 (+ total (suma n))))
+      ((= r veces) total)))
+
+(repetir 2000 100000)
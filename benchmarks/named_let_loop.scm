@@ -0,0 +1,14 @@
+;;; Suma 0..n con un let con nombre (bucle nativo con nodos phi).
+
+(define (suma n)
+  (let loop ((i 0) (acc 0))
+    (if (> i n)
+        acc
+        (loop (+ i 1) (+ acc i)))))
+
+(define (repetir veces n)
+  (do ((r 0 (+ r 1))
+       (total 0 (+ total (suma n))))
+      ((= r veces) total)))
+
+(repetir 2000 100000)
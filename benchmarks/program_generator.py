@@ -0,0 +1,63 @@
+"""
+Synthetic Scheme program generator for compiler throughput benchmarks.
+
+Programs only use features this compiler supports, and every definition is
+reachable from the final expression so tree shaking keeps all of them.
+
+    generate_program(defines=50, depth=3, expr_size=8, helpers=2)
+
+- defines:   number of top-level function definitions
+- depth:     nesting depth of let/if forms inside each body
+- expr_size: number of arithmetic operations in each leaf expression
+- helpers:   nested helper definitions per function (lifted by LambdaLifter)
+"""
+import random
+
+OPERATORS = ['+', '-', '*']
+
+def _arith(rng, variables, size):
+    # Left-leaning chain of `size` binary operations over variables and small literals
+    expr = rng.choice(variables)
+    for _ in range(size):
+        operand = rng.choice(variables) if rng.random() < 0.7 else str(rng.randint(1, 9))
+        expr = f"({rng.choice(OPERATORS)} {expr} {operand})"
+    return expr
+
+def _body(rng, variables, depth, expr_size, calls):
+    # Alternates let and if down to `depth`, then emits an arithmetic leaf
+    if depth == 0:
+        leaf = _arith(rng, variables, expr_size)
+        for call in calls:
+            leaf = f"(+ {leaf} {call})"
+        return leaf
+    if depth % 2:
+        name = f"v{depth}"
+        init = _arith(rng, variables, max(1, expr_size // 2))
+        inner = _body(rng, variables + [name], depth - 1, expr_size, calls)
+        return f"(let (({name} {init})) {inner})"
+    test = f"(< {rng.choice(variables)} {rng.randint(1, 100)})"
+    then = _body(rng, variables, depth - 1, expr_size, calls)
+    other = _arith(rng, variables, expr_size)
+    return f"(if {test} {then} {other})"
+
+def generate_program(defines=50, depth=3, expr_size=8, helpers=2, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(defines):
+        params = ["a", "b"]
+        helper_defs = []
+        calls = []
+        for h in range(helpers):
+            # Helpers capture the enclosing parameters
+            helper_body = _body(rng, ["x"] + params, depth, expr_size, [])
+            helper_defs.append(f"  (define (h{h} x) {helper_body})")
+            calls.append(f"(h{h} {rng.choice(params)})")
+        if i > 0:
+            calls.append(f"(f{i - 1} a b)")
+        body = _body(rng, params, depth, expr_size, calls)
+        lines.append(f"(define (f{i} a b)\n" + "".join(d + "\n" for d in helper_defs) + f"  {body})")
+    lines.append(f"(f{defines - 1} 1 2)")
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    print(generate_program(defines=3, depth=2, expr_size=3, helpers=1))
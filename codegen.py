@@ -1,36 +1,266 @@
+import os
 from llvmlite import ir
 import llvmlite.binding as llvm
 from ast_nodes import *
 
+# Tagged value representation, see runtime/scheme.h.
+# Fixnums are (n << 1); heap pointers are ptr | 1; immediates end in 0b011.
+FIXNUM_MIN = -(1 << 62)
+FIXNUM_MAX = (1 << 62) - 1
+FALSE = 0x03
+TRUE = 0x0b
+NIL = 0x13
+UNSPECIFIED = 0x1b
+
+# Heap object type tags (first word of every heap object)
+TYPE_BIGNUM = 1
+TYPE_FLONUM = 2
+TYPE_STRING = 3
+TYPE_SYMBOL = 4
+TYPE_PAIR = 5
+TYPE_HASH_TABLE = 6
+
+# scm_compare result for numbers with no order (NaN): every comparison is false
+UNORDERED = 2
+
+# Fibonacci hashing multiplier, SCM_HASH_MULTIPLIER in runtime/scheme.h
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+# Hash table primitives taking (table key args...): runtime entry point and arity.
+# The key's hash is computed at the call site and passed after the key.
+HASH_TABLE_OPS = {
+    'hash-table-ref': ('scm_hash_table_ref', 2),
+    'hash-table-ref/default': ('scm_hash_table_ref_default', 3),
+    'hash-table-set!': ('scm_hash_table_set', 3),
+    'hash-table-delete!': ('scm_hash_table_delete', 2),
+    'hash-table-contains?': ('scm_hash_table_contains', 2),
+    'hash-table-exists?': ('scm_hash_table_contains', 2),
+}
+
+# Weights for the inline fixnum path vs. the runtime slow path
+LIKELY = [1000, 1]
+UNLIKELY = [1, 1000]
+
+class LoopHeader:
+    """A named let or do loop: calls to it in tail position jump back to `block`."""
+    def __init__(self, block, phis):
+        self.block = block
+        self.phis = phis
+
+class ConstantPool:
+    """
+    Emits literal data (quoted datums, strings, non-fixnum numbers) as read-only
+    module globals laid out like runtime heap objects, so no literal is built at
+    startup. Identical constants are emitted once; symbols are interned in a
+    compile-time table, so equal symbols are the same word and `eq?` is a compare.
+    """
+    def __init__(self, module):
+        self.module = module
+        self.word_type = ir.IntType(64)
+        self.entries = {}  # structural key -> tagged word (constant expression)
+        self.counter = 0
+
+    def datum(self, node):
+        """Tagged i64 constant for a literal or quoted datum."""
+        return self._datum(node)[1]
+
+    def _word(self, value):
+        return ir.Constant(self.word_type, value)
+
+    def _datum(self, node):
+        # Returns (key, word); the key identifies the constant structurally.
+        if isinstance(node, Number):
+            return self._number(node.value)
+        elif isinstance(node, Bool):
+            return ('imm', node.value), self._word(TRUE if node.value else FALSE)
+        elif isinstance(node, String):
+            return self._string(node.value)
+        elif isinstance(node, Symbol):
+            return self._symbol(node.name)
+        elif isinstance(node, Quote):
+            # 'x inside quoted data is the list (quote x)
+            return self._list([Symbol("quote"), node.datum])
+        elif isinstance(node, LispList):
+            return self._list(node.elements, node.tail)
+        raise Exception(f"Unsupported literal: {node}")
+
+    def _number(self, value):
+        if isinstance(value, int):
+            if FIXNUM_MIN <= value <= FIXNUM_MAX:
+                return ('fixnum', value), self._word(value << 1)
+            # Bignum: sign, length, little-endian base 2^32 digits
+            digits = []
+            mag = abs(value)
+            while mag:
+                digits.append(mag & 0xffffffff)
+                mag >>= 32
+            i32 = ir.IntType(32)
+            return self._emit(('bignum', value), 'bignum', [
+                self._word(TYPE_BIGNUM),
+                ir.Constant(i32, -1 if value < 0 else 1),
+                ir.Constant(i32, len(digits)),
+                ir.Constant(ir.ArrayType(i32, len(digits)), digits),
+            ])
+        # Keyed by the exact bit pattern so 0.0 and -0.0 stay distinct
+        return self._emit(('flonum', float(value).hex()), 'flonum', [
+            self._word(TYPE_FLONUM),
+            ir.Constant(ir.DoubleType(), float(value)),
+        ])
+
+    def _string(self, text):
+        data = text.encode("utf8")
+        return self._emit(('string', text), 'str', [
+            self._word(TYPE_STRING),
+            self._word(len(data)),
+            ir.Constant(ir.ArrayType(ir.IntType(8), len(data) + 1), bytearray(data + b"\0")),
+        ])
+
+    def _symbol(self, name):
+        # The compile-time intern table is `entries` itself
+        _, name_word = self._string(name)
+        return self._emit(('symbol', name), 'sym', [self._word(TYPE_SYMBOL), name_word])
+
+    def _list(self, elements, tail=None):
+        # Proper lists end in '(); dotted data ends in its tail datum
+        key, word = ('imm', 'nil'), self._word(NIL)
+        if tail is not None:
+            key, word = self._datum(tail)
+        for element in reversed(elements):
+            car_key, car_word = self._datum(element)
+            key, word = self._emit(('pair', car_key, key), 'pair', [self._word(TYPE_PAIR), car_word, word])
+        return key, word
+
+    def _emit(self, key, prefix, fields):
+        if key in self.entries:
+            return key, self.entries[key]
+        const = ir.Constant.literal_struct(fields)
+        self.counter += 1
+        global_var = ir.GlobalVariable(self.module, const.type, name=f"{prefix}.{self.counter}")
+        global_var.linkage = 'private'
+        global_var.global_constant = True
+        global_var.initializer = const
+        global_var.align = 8
+        # Tagged pointer: address + 1, as a constant expression
+        byte_ptr = global_var.bitcast(ir.IntType(8).as_pointer())
+        word = byte_ptr.gep([self._word(1)]).ptrtoint(self.word_type)
+        self.entries[key] = word
+        return key, word
+
+class DebugInfo:
+    """
+    DWARF metadata for one source file: a compile unit, a subprogram per
+    generated function and line/column locations for the instructions of each
+    form, so debuggers and `perf` map machine code back to the .scm source.
+    """
+    def __init__(self, module, filename):
+        self.module = module
+        # Linkage name -> (source name, file, line) of every subprogram
+        self.functions = {}
+        self.filename = os.path.basename(filename)
+        path = os.path.abspath(filename)
+        self.file = module.add_debug_info("DIFile", {
+            "filename": os.path.basename(path),
+            "directory": os.path.dirname(path),
+        })
+        # DWARF has no language code for Scheme; C keeps every consumer happy
+        self.unit = module.add_debug_info("DICompileUnit", {
+            "language": ir.DIToken("DW_LANG_C"),
+            "file": self.file,
+            "producer": "porgetit-scheme-compiler",
+            "runtimeVersion": 0,
+            "isOptimized": True,
+            "emissionKind": ir.DIToken("FullDebug"),
+        }, is_distinct=True)
+        module.add_named_metadata("llvm.dbg.cu", self.unit)
+
+        i32 = ir.IntType(32)
+        module.add_named_metadata("llvm.module.flags", [i32(2), "Dwarf Version", i32(4)])
+        module.add_named_metadata("llvm.module.flags", [i32(2), "Debug Info Version", i32(3)])
+
+        # Every Scheme value is one tagged word
+        self.value_type = module.add_debug_info("DIBasicType", {
+            "name": "scm_value",
+            "size": 64,
+            "encoding": ir.DIToken("DW_ATE_unsigned"),
+        })
+
+    def subprogram(self, func, source_name, line):
+        """Attaches a DISubprogram to `func`; returns it as the scope for its locations."""
+        sub_type = self.module.add_debug_info("DISubroutineType", {
+            "types": self.module.add_metadata([self.value_type] * (len(func.args) + 1)),
+        })
+        sp = self.module.add_debug_info("DISubprogram", {
+            "name": source_name,
+            "linkageName": func.name,
+            "scope": self.file,
+            "file": self.file,
+            "line": line,
+            "type": sub_type,
+            "scopeLine": line,
+            "spFlags": ir.DIToken("DISPFlagDefinition | DISPFlagOptimized"),
+            "unit": self.unit,
+        }, is_distinct=True)
+        func.set_metadata("dbg", sp)
+        self.functions[func.name] = (source_name, self.filename, line)
+        return sp
+
+    def location(self, line, column, scope):
+        return self.module.add_debug_info("DILocation", {
+            "line": line,
+            "column": column or 0,
+            "scope": scope,
+        })
+
 class CodeGen:
-    def __init__(self):
+    def __init__(self, filename=None):
         self.module = ir.Module(name="scheme_module")
         self.module.triple = llvm.get_default_triple()
         self.builder = None
         self.func_symtab = {}
+
+        # DWARF line info when compiling a source file with debug info (-g)
+        self.debug = DebugInfo(self.module, filename) if filename else None
+        self.debug_scope = None
+        # Source name, file and line per generated function (for perf maps)
+        self.function_sources = self.debug.functions if self.debug else {}
         
-        # We use purely doubles for this MVP
-        self.double_type = ir.DoubleType()
+        # Every Scheme value is a tagged 64-bit word
+        self.value_type = ir.IntType(64)
         self.bool_type = ir.IntType(1)
 
-        # Setup external functions (printf)
-        voidptr_ty = ir.IntType(8).as_pointer()
-        printf_ty = ir.FunctionType(ir.IntType(32), [voidptr_ty], var_arg=True)
-        self.printf = ir.Function(self.module, printf_ty, name="printf")
+        # Read-only literal data shared across the module
+        self.constants = ConstantPool(self.module)
 
         # Setup main function (entry point)
         self.main_func = None
 
-    def _codegen(self, node, symtab=None):
+    def _codegen(self, node, symtab=None, tail=False):
+        # With debug info, instructions emitted for a form carry its source
+        # location; the caller's location is restored for what it emits next.
+        if self.debug is None or node is None or node.line is None:
+            return self._codegen_node(node, symtab, tail)
+        outer = self.builder.debug_metadata
+        self.builder.debug_metadata = self.debug.location(node.line, node.column, self.debug_scope)
+        try:
+            return self._codegen_node(node, symtab, tail)
+        finally:
+            self.builder.debug_metadata = outer
+
+    def _codegen_node(self, node, symtab=None, tail=False):
+        # `tail` marks expressions in tail position of a loop body. A tail call
+        # to a loop branches back to its header and yields None (no value).
         if symtab is None:
             symtab = {}
 
-        if isinstance(node, Number):
-            return ir.Constant(self.double_type, float(node.value))
+        if isinstance(node, (Number, Bool, String)):
+            return self.constants.datum(node)
+
+        elif isinstance(node, Quote):
+            return self.constants.datum(node.datum)
 
         elif isinstance(node, Symbol):
             # Look up variable
-            if node.name in symtab:
+            if node.name in symtab and not isinstance(symtab[node.name], LoopHeader):
                 return symtab[node.name]
             else:
                 raise Exception(f"Undefined variable: {node.name}")
@@ -39,11 +269,8 @@ class CodeGen:
              # IF is an expression in Scheme, so it must return a value (Phi node)
              cond = self._codegen(node.test, symtab)
              
-             # Convert condition to bool (i1) if strictly needed, 
-             # but Scheme treats almost anything as true. For MVP, assume cond is boolean logic result (i1) OR double.
-             # If it's double (0.0 vs others), let's compare != 0
-             if cond.type == self.double_type:
-                 cond = self.builder.fcmp_ordered('!=', cond, ir.Constant(self.double_type, 0.0))
+             # Scheme treats every value except #f as true
+             cond = self._truthy(cond)
 
              then_block = self.builder.append_basic_block('then')
              else_block = self.builder.append_basic_block('else')
@@ -53,62 +280,130 @@ class CodeGen:
 
              # THEN
              self.builder.position_at_end(then_block)
-             then_val = self._codegen(node.consequent, symtab)
-             self.builder.branch(merge_block)
+             then_val = self._codegen(node.consequent, symtab, tail)
              # Capture updated block (codegen might have added more blocks inside)
              then_bb = self.builder.block
+             if then_val is not None:
+                 self.builder.branch(merge_block)
 
              # ELSE
              self.builder.position_at_end(else_block)
              if node.alternate:
-                 else_val = self._codegen(node.alternate, symtab)
+                 else_val = self._codegen(node.alternate, symtab, tail)
              else:
-                 else_val = ir.Constant(self.double_type, 0.0) # Void value
-             self.builder.branch(merge_block)
+                 else_val = self._const(UNSPECIFIED) # Void value
              else_bb = self.builder.block
+             if else_val is not None:
+                 self.builder.branch(merge_block)
 
              # MERGE
+             # A branch that jumped back to a loop header contributes no value.
              self.builder.position_at_end(merge_block)
-             phi = self.builder.phi(self.double_type, 'if_result')
-             phi.add_incoming(then_val, then_bb)
-             phi.add_incoming(else_val, else_bb)
+             incoming = [(v, bb) for v, bb in ((then_val, then_bb), (else_val, else_bb)) if v is not None]
+             if not incoming:
+                 self.builder.unreachable()
+                 return None
+             phi = self.builder.phi(self.value_type, 'if_result')
+             for val, bb in incoming:
+                 phi.add_incoming(val, bb)
              return phi
 
+        elif isinstance(node, Begin):
+            return self._codegen_body(node.body, symtab, tail)
+
+        elif isinstance(node, Let):
+            # Inits are evaluated in the outer scope, then bound as plain SSA values.
+            values = [self._codegen(init, symtab) for _, init in node.bindings]
+            if node.name is not None:
+                return self._codegen_named_let(node, values, symtab, tail)
+            local_symtab = dict(symtab)
+            for (var, _), val in zip(node.bindings, values):
+                local_symtab[var.name] = val
+            return self._codegen_body(node.body, local_symtab, tail)
+
+        elif isinstance(node, (LetStar, Letrec)):
+            # Letrec lambdas were lifted already, so the remaining inits bind in order.
+            local_symtab = dict(symtab)
+            for var, init in node.bindings:
+                local_symtab[var.name] = self._codegen(init, local_symtab)
+            return self._codegen_body(node.body, local_symtab, tail)
+
+        elif isinstance(node, Do):
+            return self._codegen_do(node, symtab, tail)
+
         elif isinstance(node, LispList): 
             # Function Call: (op arg1 arg2 ...)
             if not node.elements:
-                return ir.Constant(self.double_type, 0.0)
+                return self._const(UNSPECIFIED)
             
             op = node.elements[0]
             args = [self._codegen(a, symtab) for a in node.elements[1:]]
 
+            if isinstance(op, Symbol) and isinstance(symtab.get(op.name), LoopHeader):
+                # Tail call to an enclosing loop: feed the phis and jump back.
+                if not tail:
+                    raise Exception(f"Loop {op.name} called outside tail position")
+                loop = symtab[op.name]
+                if len(args) != len(loop.phis):
+                    raise Exception(f"Loop {op.name} expects {len(loop.phis)} arguments")
+                for phi, arg in zip(loop.phis, args):
+                    phi.add_incoming(arg, self.builder.block)
+                self.builder.branch(loop.block)
+                return None
+
             if isinstance(op, Symbol):
                 # Builtins
-                if op.name == '+': 
-                    return self.builder.fadd(args[0], args[1]) # Simplify unary/multi arity later
+                if op.name in ('+', '*'):
+                    # Fold left; (+) is 0 and (*) is 1
+                    result = self._const_fixnum(0 if op.name == '+' else 1)
+                    for i, arg in enumerate(args):
+                        result = arg if i == 0 else self._fixnum_arith(op.name, result, arg)
+                    return result
                 elif op.name == '-':
                     if len(args) == 1: # Unary negation
-                        return self.builder.fsub(ir.Constant(self.double_type, 0.0), args[0])
-                    return self.builder.fsub(args[0], args[1])
-                elif op.name == '*':
-                    return self.builder.fmul(args[0], args[1])
+                        return self._fixnum_arith('-', self._const_fixnum(0), args[0])
+                    result = args[0]
+                    for arg in args[1:]:
+                        result = self._fixnum_arith('-', result, arg)
+                    return result
                 elif op.name == '/':
-                    return self.builder.fdiv(args[0], args[1])
+                    # Division always goes through the runtime (exact when it divides evenly)
+                    if len(args) == 1:
+                        args = [self._const_fixnum(1)] + args
+                    result = args[0]
+                    for arg in args[1:]:
+                        result = self.builder.call(self._runtime('scm_div', 2), [result, arg])
+                    return result
+                elif op.name == 'eq?':
+                    # Symbols are interned and small values are immediate: compare words
+                    res_i1 = self.builder.icmp_unsigned('==', args[0], args[1])
+                    return self.builder.select(res_i1, self._const(TRUE), self._const(FALSE))
+                elif op.name == 'null?':
+                    res_i1 = self.builder.icmp_unsigned('==', args[0], self._const(NIL))
+                    return self.builder.select(res_i1, self._const(TRUE), self._const(FALSE))
+                elif op.name in ('pair?', 'symbol?', 'string?', 'hash-table?'):
+                    type_tag = {'pair?': TYPE_PAIR, 'symbol?': TYPE_SYMBOL, 'string?': TYPE_STRING,
+                                'hash-table?': TYPE_HASH_TABLE}[op.name]
+                    res_i1 = self._has_type(args[0], type_tag)
+                    return self.builder.select(res_i1, self._const(TRUE), self._const(FALSE))
+                elif op.name in ('car', 'cdr'):
+                    return self._pair_field(op.name, args[0])
+                elif op.name == 'make-hash-table':
+                    return self.builder.call(self._runtime('scm_make_hash_table', 0), [])
+                elif op.name == 'hash-table-size':
+                    return self.builder.call(self._runtime('scm_hash_table_size', 1), args)
+                elif op.name in HASH_TABLE_OPS:
+                    runtime_name, arity = HASH_TABLE_OPS[op.name]
+                    if len(args) != arity:
+                        raise Exception(f"{op.name} expects {arity} arguments")
+                    table, key = args[0], args[1]
+                    call_args = [table, key, self._hash_key(key)] + args[2:]
+                    return self.builder.call(self._runtime(runtime_name, len(call_args)), call_args)
                 elif op.name in ['>', '<', '=']:
                     # Compare
-                    cmp_op = op.name if op.name != '=' else '==' # '==' not '=' in LLVM
-                    # For doubles, use fcmp_ordered
-                    if op.name == '=': pred = 'oeq'
-                    elif op.name == '>': pred = 'ogt'
-                    elif op.name == '<': pred = 'olt'
-                    
-                    # fcmp returns i1 (bool). We must cast back to double for our untyped world?
-                    # Or keep as i1 and let IF handle it. 
-                    # For MVP consistency, let's keep boolean logic internal or cast to double 1.0/0.0?
-                    # Scheme standard: #t/#f.
-                    # Let's return numbers 1.0/0.0 so they can be passed around easily in our double-only world.
-                    res_i1 = self.builder.fcmp_ordered(pred, args[0], args[1])
-                    return self.builder.uitofp(res_i1, self.double_type)
+                    pred = '==' if op.name == '=' else op.name # '==' not '=' in LLVM
+                    res_i1 = self._fixnum_compare(pred, args[0], args[1])
+                    return self.builder.select(res_i1, self._const(TRUE), self._const(FALSE))
 
                 # Custom Function Calls
                 elif op.name in self.func_symtab:
@@ -125,7 +420,230 @@ class CodeGen:
             
             raise Exception("Function position must be a symbol")
             
-        return ir.Constant(self.double_type, 0.0)
+        return self._const(UNSPECIFIED)
+
+    def _const(self, word):
+        return ir.Constant(self.value_type, word)
+
+    def _const_fixnum(self, n):
+        return ir.Constant(self.value_type, n << 1)
+
+    def _runtime(self, name, n_args, ret=None, arg_types=None):
+        # Declare a runtime.c / numbers.c function on first use
+        func = self.module.globals.get(name)
+        if func is None:
+            arg_types = arg_types or [self.value_type] * n_args
+            func_ty = ir.FunctionType(ret or self.value_type, arg_types)
+            func = ir.Function(self.module, func_ty, name=name)
+        return func
+
+    def _heap_field(self, val, index):
+        # Load word `index` of the heap object behind a tagged pointer
+        ptr = self.builder.inttoptr(self.builder.sub(val, self._const(1)), self.value_type.as_pointer())
+        return self.builder.load(self.builder.gep(ptr, [self._const(index)]))
+
+    def _has_type(self, val, type_tag):
+        # Heap pointer whose header carries `type_tag`; the load is guarded by the tag check
+        check_block = self.builder.append_basic_block('type_check')
+        done_block = self.builder.append_basic_block('type_done')
+        entry_block = self.builder.block
+        is_heap = self.builder.icmp_unsigned('==', self.builder.and_(val, self._const(7)), self._const(1))
+        self.builder.cbranch(is_heap, check_block, done_block)
+
+        self.builder.position_at_end(check_block)
+        matches = self.builder.icmp_unsigned('==', self._heap_field(val, 0), self._const(type_tag))
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(done_block)
+        phi = self.builder.phi(self.bool_type, 'has_type')
+        phi.add_incoming(ir.Constant(self.bool_type, 0), entry_block)
+        phi.add_incoming(matches, check_block)
+        return phi
+
+    def _pair_field(self, name, val):
+        # Inline car/cdr; anything but a pair goes to the runtime, which reports the error
+        fast_block = self.builder.append_basic_block('pair')
+        slow_block = self.builder.append_basic_block('not_pair')
+        done_block = self.builder.append_basic_block('pair_done')
+        self.builder.cbranch(self._has_type(val, TYPE_PAIR), fast_block, slow_block).set_weights(LIKELY)
+
+        self.builder.position_at_end(fast_block)
+        fast_val = self._heap_field(val, 1 if name == 'car' else 2)
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(slow_block)
+        slow_val = self.builder.call(self._runtime(f"scm_{name}", 1), [val])
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(done_block)
+        phi = self.builder.phi(self.value_type, name)
+        phi.add_incoming(fast_val, fast_block)
+        phi.add_incoming(slow_val, slow_block)
+        return phi
+
+    def _hash_key(self, key):
+        # Fixnums, immediates and interned symbols hash their word inline;
+        # strings and numbers boxed on the heap are hashed by content in the runtime.
+        heap_block = self.builder.append_basic_block('hash_heap_key')
+        word_block = self.builder.append_basic_block('hash_word')
+        slow_block = self.builder.append_basic_block('hash_runtime')
+        done_block = self.builder.append_basic_block('hash_done')
+        is_heap = self.builder.icmp_unsigned('==', self.builder.and_(key, self._const(7)), self._const(1))
+        self.builder.cbranch(is_heap, heap_block, word_block)
+
+        self.builder.position_at_end(heap_block)
+        is_symbol = self.builder.icmp_unsigned('==', self._heap_field(key, 0), self._const(TYPE_SYMBOL))
+        self.builder.cbranch(is_symbol, word_block, slow_block).set_weights(LIKELY)
+
+        self.builder.position_at_end(word_block)
+        word_hash = self.builder.mul(key, self._const(HASH_MULTIPLIER))
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(slow_block)
+        slow_hash = self.builder.call(self._runtime('scm_hash', 1), [key])
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(done_block)
+        phi = self.builder.phi(self.value_type, 'hash')
+        phi.add_incoming(word_hash, word_block)
+        phi.add_incoming(slow_hash, slow_block)
+        return phi
+
+    def _truthy(self, val):
+        return self.builder.icmp_unsigned('!=', val, self._const(FALSE))
+
+    def _both_fixnums(self, a, b):
+        # Fixnums have a clear low bit, so (a | b) & 1 tests both at once
+        tag = self.builder.and_(self.builder.or_(a, b), self._const(1))
+        return self.builder.icmp_unsigned('==', tag, self._const(0))
+
+    def _fixnum_arith(self, name, a, b):
+        """
+        Inline fixnum +, - or * on tagged words using LLVM overflow intrinsics.
+        Non-fixnum operands or an overflow fall into the runtime (bignum/flonum).
+        """
+        fast_block = self.builder.append_basic_block('fixnum')
+        slow_block = self.builder.append_basic_block('generic')
+        done_block = self.builder.append_basic_block('arith_done')
+        self.builder.cbranch(self._both_fixnums(a, b), fast_block, slow_block).set_weights(LIKELY)
+
+        # FAST: (x << 1) op (y << 1) is already tagged for + and -;
+        # for * one operand is untagged first.
+        self.builder.position_at_end(fast_block)
+        if name == '+':
+            res = self.builder.sadd_with_overflow(a, b)
+        elif name == '-':
+            res = self.builder.ssub_with_overflow(a, b)
+        else:
+            res = self.builder.smul_with_overflow(self.builder.ashr(a, self._const(1)), b)
+        fast_val = self.builder.extract_value(res, 0)
+        overflow = self.builder.extract_value(res, 1)
+        self.builder.cbranch(overflow, slow_block, done_block).set_weights(UNLIKELY)
+
+        # SLOW
+        self.builder.position_at_end(slow_block)
+        runtime_name = {'+': 'scm_add', '-': 'scm_sub', '*': 'scm_mul'}[name]
+        slow_val = self.builder.call(self._runtime(runtime_name, 2), [a, b])
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(done_block)
+        phi = self.builder.phi(self.value_type, 'num')
+        phi.add_incoming(fast_val, fast_block)
+        phi.add_incoming(slow_val, slow_block)
+        return phi
+
+    def _fixnum_compare(self, pred, a, b):
+        # Tagging preserves order, so fixnums compare as plain integers
+        fast_block = self.builder.append_basic_block('fixnum_cmp')
+        slow_block = self.builder.append_basic_block('generic_cmp')
+        done_block = self.builder.append_basic_block('cmp_done')
+        self.builder.cbranch(self._both_fixnums(a, b), fast_block, slow_block).set_weights(LIKELY)
+
+        self.builder.position_at_end(fast_block)
+        fast_val = self.builder.icmp_signed(pred, a, b)
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(slow_block)
+        # The slow path matches the exact order, so an UNORDERED result fails all three
+        order = self.builder.call(self._runtime('scm_compare', 2), [a, b])
+        expected = {'==': 0, '<': -1, '>': 1}[pred]
+        slow_val = self.builder.icmp_signed('==', order, self._const(expected))
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(done_block)
+        phi = self.builder.phi(self.bool_type, 'cmp')
+        phi.add_incoming(fast_val, fast_block)
+        phi.add_incoming(slow_val, slow_block)
+        return phi
+
+    def _codegen_body(self, body, symtab, tail=False):
+        # Evaluate all, return last
+        ret_val = self._const(UNSPECIFIED)
+        for i, expr in enumerate(body):
+            ret_val = self._codegen(expr, symtab, tail and i == len(body) - 1)
+        return ret_val
+
+    def _loop_header(self, var_names, values):
+        # Branch into a fresh header block with one phi per loop variable.
+        entry_bb = self.builder.block
+        header = self.builder.append_basic_block('loop')
+        self.builder.branch(header)
+        self.builder.position_at_end(header)
+        phis = []
+        for name, val in zip(var_names, values):
+            phi = self.builder.phi(self.value_type, name)
+            phi.add_incoming(val, entry_bb)
+            phis.append(phi)
+        return LoopHeader(header, phis)
+
+    def _codegen_named_let(self, node, values, symtab, tail):
+        # (let name ((var init) ...) body): the lifter guarantees every use of
+        # `name` is a tail call, so the body becomes the loop and its value the result.
+        # Inside an enclosing loop body every exit may jump back to that loop instead.
+        loop = self._loop_header([var.name for var, _ in node.bindings], values)
+        local_symtab = dict(symtab)
+        local_symtab[node.name.name] = loop
+        for (var, _), phi in zip(node.bindings, loop.phis):
+            local_symtab[var.name] = phi
+        result = self._codegen_body(node.body, local_symtab, tail=True)
+        if result is None and not tail:
+            raise Exception(f"Named let {node.name.name} never exits")
+        return result
+
+    def _codegen_do(self, node, symtab, tail):
+        # (do ((var init step) ...) (test result ...) command ...)
+        values = [self._codegen(init, symtab) for _, init, _ in node.specs]
+        loop = self._loop_header([var.name for var, _, _ in node.specs], values)
+        local_symtab = dict(symtab)
+        for (var, _, _), phi in zip(node.specs, loop.phis):
+            local_symtab[var.name] = phi
+
+        cond = self._truthy(self._codegen(node.test, local_symtab))
+        body_block = self.builder.append_basic_block('do_body')
+        exit_block = self.builder.append_basic_block('do_exit')
+        self.builder.cbranch(cond, exit_block, body_block)
+
+        # BODY: commands, then steps (variables without a step keep their value)
+        self.builder.position_at_end(body_block)
+        for cmd in node.commands:
+            self._codegen(cmd, local_symtab)
+        steps = [self._codegen(step, local_symtab) if step is not None else phi
+                 for (_, _, step), phi in zip(node.specs, loop.phis)]
+        for phi, val in zip(loop.phis, steps):
+            phi.add_incoming(val, self.builder.block)
+        self.builder.branch(loop.block)
+
+        # EXIT
+        self.builder.position_at_end(exit_block)
+        return self._codegen_body(node.result, local_symtab, tail)
+
+    def _begin_debug_function(self, func, name, line):
+        # New function: its instructions default to the line of its definition
+        if self.debug is None:
+            return None
+        self.debug_scope = self.debug.subprogram(func, name, line)
+        self.builder.debug_metadata = self.debug.location(line, 0, self.debug_scope)
+        return self.debug_scope
 
     def generate(self, ast):
         # Initialize
@@ -139,6 +657,7 @@ class CodeGen:
         self.main_func = ir.Function(self.module, main_ty, name="main")
         block = self.main_func.append_basic_block(name="entry")
         self.builder = ir.IRBuilder(block)
+        main_scope = self._begin_debug_function(self.main_func, "main", 1)
 
         # Process top-level expressions
         # Separate Definitions from Expressions
@@ -157,9 +676,9 @@ class CodeGen:
                 func_name = expr.target.name
                 params = expr.value.params
                 
-                # Assume all params are doubles
-                param_types = [self.double_type] * len(params)
-                func_ty = ir.FunctionType(self.double_type, param_types)
+                # All params and results are tagged values
+                param_types = [self.value_type] * len(params)
+                func_ty = ir.FunctionType(self.value_type, param_types)
                 func = ir.Function(self.module, func_ty, name=func_name)
                 
                 self.func_symtab[func_name] = func
@@ -176,6 +695,7 @@ class CodeGen:
                 # Create blocks
                 bb = func.append_basic_block(name="entry")
                 self.builder = ir.IRBuilder(bb)
+                self._begin_debug_function(func, expr.source_name or func_name, expr.line or 1)
                 
                 # Create local symtab for args
                 local_symtab = {}
@@ -184,23 +704,16 @@ class CodeGen:
                     local_symtab[arg.name] = arg
                 
                 # Codegen Body (Evaluate all, return last)
-                ret_val = None
-                for body_expr in expr.value.body:
-                     ret_val = self._codegen(body_expr, local_symtab)
+                ret_val = self._codegen_body(expr.value.body, local_symtab)
                 
                 self.builder.ret(ret_val)
         
         # 3. Compile Main Body (Top-level expressions)
         self.builder = main_builder
+        self.debug_scope = main_scope
         
-        # Setup format string for printf
-        # "Result: %f\n"
-        fmt = "Result: %f\n\0"
-        c_fmt = ir.Constant(ir.ArrayType(ir.IntType(8), len(fmt)), bytearray(fmt.encode("utf8")))
-        global_fmt = ir.GlobalVariable(self.module, c_fmt.type, name="fstr")
-        global_fmt.linkage = 'internal'
-        global_fmt.global_constant = True
-        global_fmt.initializer = c_fmt
+        # Results are printed by the runtime ("Result: <value>")
+        print_result = self._runtime('scm_print_result', 1, ret=ir.VoidType())
 
         for expr in expressions:
             # Skip calls to define, they are handled (unless define variable)
@@ -213,9 +726,7 @@ class CodeGen:
             val = self._codegen(expr)
             
             # Print result
-            # call printf
-            voidptr_fmt = self.builder.bitcast(global_fmt, ir.IntType(8).as_pointer())
-            self.builder.call(self.printf, [voidptr_fmt, val])
+            self.builder.call(print_result, [val])
 
         # Return 0
         self.builder.ret(ir.Constant(ir.IntType(32), 0))
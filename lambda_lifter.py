@@ -1,9 +1,70 @@
 from ast_nodes import *
 
+# Marker for names bound to plain values (params, let variables) in a Scope.
+LOCAL = "local"
+
+class Scope:
+    """
+    Persistent environment: each scope only stores its own bindings and links
+    to its parent, so entering a scope never copies the enclosing one.
+    A binding is either LOCAL (a variable) or (lifted_name, [captures]), where
+    each capture is a (scope, name) pair identifying the captured variable.
+    The scope of a lifted function also maps its captures to the fresh
+    parameters that receive them.
+    Scopes are never mutated, so lookups through the parent chain are cached.
+    """
+    def __init__(self, parent=None, bindings=None, captures=None):
+        self.parent = parent
+        self.bindings = bindings or {}
+        self.captures = captures or {}
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self._resolved = {}
+        self._references = {}
+
+    def resolve(self, name):
+        # (scope, entry) of the binding of `name`; (None, None) if unbound.
+        if name in self.bindings:
+            return self, self.bindings[name]
+        if name not in self._resolved:
+            # Unbound: a global variable or a builtin, never captured.
+            self._resolved[name] = self.parent.resolve(name) if self.parent is not None else (None, None)
+        return self._resolved[name]
+
+    def lookup(self, name):
+        return self.resolve(name)[1]
+
+    def reference(self, scope, name):
+        """
+        Name under which the variable `name` bound in `scope` is visible here:
+        the name itself, the parameter a lifted function receives it in,
+        or None when an inner binding of the same name hides it.
+        """
+        key = (scope, name)
+        if key in self.captures:
+            return self.captures[key]
+        if self is scope:
+            return name
+        if key not in self._references:
+            ref = self.parent.reference(scope, name)
+            if ref == name and name in self.bindings:
+                ref = None
+            self._references[key] = ref
+        return self._references[key]
+
+    def extend(self, names):
+        # Child scope binding `names` as local variables.
+        if not names:
+            return self
+        return Scope(self, {n: LOCAL for n in names})
+
 class LambdaLifter:
     def __init__(self):
         self.lifted_funcs = []
         self.counter = 0
+        # id(Lambda) -> (Lambda, frozenset of free names), computed once per lambda.
+        # The entry keeps the node alive, so its id cannot be reused by a later
+        # temporary Lambda (e.g. the one built for a lifted named let).
+        self._free_cache = {}
 
     def lift(self, ast):
         # We assume input is a Program with a list of global expressions
@@ -13,22 +74,21 @@ class LambdaLifter:
         new_exprs = []
         
         # Analyze top-level expressions
-        # Global scope defines don't capture anything usually in MVP, 
-        # but their bodies might contain nested defines.
-        
-        global_env = {} # name -> (new_name, [captured_vars])
+        # Global functions are registered up front so forward references resolve;
+        # they never capture anything, but their bodies might contain nested defines.
+        global_env = Scope(bindings={
+            expr.target.name: (expr.target.name, [])
+            for expr in ast.expressions
+            if isinstance(expr, Define) and isinstance(expr.value, Lambda)
+        })
         
         for expr in ast.expressions:
             # We only really care about transforming top-level defines that are functions
             if isinstance(expr, Define) and isinstance(expr.value, Lambda):
-                func_name = expr.target.name
-                # Register global name
-                global_env[func_name] = (func_name, [])
-                
                 # Transform body
                 transformed_lambda = self._transform_lambda(expr.value, global_env)
                 
-                new_exprs.append(Define(expr.target, transformed_lambda))
+                new_exprs.append(with_pos(Define(expr.target, transformed_lambda), expr))
             else:
                 # Other top level exprs (e.g. calls)
                 new_exprs.append(self._transform_expr(expr, global_env))
@@ -47,158 +107,328 @@ class LambdaLifter:
             op = node.elements[0]
             args = [self._transform_expr(a, env) for a in node.elements[1:]]
             
-            if isinstance(op, Symbol) and op.name in env:
+            entry = env.lookup(op.name) if isinstance(op, Symbol) else None
+            if entry is not None and entry is not LOCAL:
                 # Compiling a call to a function we track
-                lifted_name, captured_vars = env[op.name]
+                lifted_name, captured_vars = entry
                 
                 # We need to pass consumed variables
-                # The captured_vars are variable names (strs) that this function expects as extra args.
-                # We simply pass them as Symbol references.
-                extra_args = [Symbol(v) for v in captured_vars]
+                # Each capture is passed under the name it has at this call site,
+                # which differs from the original one inside another lifted function.
+                extra_args = self._capture_args(op.name, captured_vars, env)
                 
                 # Update call
                 new_elements = [Symbol(lifted_name)] + args + extra_args
-                return LispList(new_elements)
+                return with_pos(LispList(new_elements), node)
             
-            return LispList([self._transform_expr(e, env) for e in node.elements])
+            return with_pos(LispList([self._transform_expr(op, env)] + args), node)
 
         elif isinstance(node, If):
-            return If(self._transform_expr(node.test, env),
-                      self._transform_expr(node.consequent, env),
-                      self._transform_expr(node.alternate, env) if node.alternate else None)
-        
+            return with_pos(If(self._transform_expr(node.test, env),
+                               self._transform_expr(node.consequent, env),
+                               self._transform_expr(node.alternate, env) if node.alternate else None), node)
+
+        elif isinstance(node, Begin):
+            return with_pos(Begin([self._transform_expr(e, env) for e in node.body]), node)
+
+        elif isinstance(node, Let):
+            bindings = [(var, self._transform_expr(init, env)) for var, init in node.bindings]
+            names = [var.name for var, _ in node.bindings]
+            if node.name is None:
+                body_env = env.extend(names)
+                return with_pos(Let(bindings, self._transform_body(node.body, body_env)), node)
+
+            # Named let: kept as a native loop when every use of the name is a tail call.
+            if self._is_loop(node.name.name, node.body):
+                body_env = env.extend(names + [node.name.name])
+                return with_pos(Let(bindings, self._transform_body(node.body, body_env), node.name), node)
+
+            # Otherwise it is a local recursive function: lift it and call it once.
+            local_env = self._lift_functions([(node.name, Lambda([v for v, _ in node.bindings], node.body))], env)
+            lifted_name, captured = local_env.lookup(node.name.name)
+            call = LispList([Symbol(lifted_name)] + [init for _, init in bindings]
+                            + self._capture_args(node.name.name, captured, env))
+            return with_pos(call, node)
+
+        elif isinstance(node, LetStar):
+            bindings = []
+            scope_env = env
+            for var, init in node.bindings:
+                bindings.append((var, self._transform_expr(init, scope_env)))
+                scope_env = scope_env.extend([var.name])
+            return with_pos(LetStar(bindings, self._transform_body(node.body, scope_env)), node)
+
+        elif isinstance(node, Letrec):
+            # Lambda bindings become lifted functions; the rest stay as SSA values.
+            funcs = [(var, init) for var, init in node.bindings if isinstance(init, Lambda)]
+            values = [(var, init) for var, init in node.bindings if not isinstance(init, Lambda)]
+            scope_env = env.extend([var.name for var, _ in values])
+            scope_env = self._lift_functions(funcs, scope_env)
+            bindings = [(var, self._transform_expr(init, scope_env)) for var, init in values]
+            return with_pos(Letrec(bindings, self._transform_body(node.body, scope_env)), node)
+
+        elif isinstance(node, Do):
+            inits = [self._transform_expr(init, env) for _, init, _ in node.specs]
+            loop_env = env.extend([var.name for var, _, _ in node.specs])
+            specs = [(var, init, self._transform_expr(step, loop_env) if step is not None else None)
+                     for (var, _, step), init in zip(node.specs, inits)]
+            return with_pos(Do(specs,
+                               self._transform_expr(node.test, loop_env),
+                               [self._transform_expr(e, loop_env) for e in node.result],
+                               [self._transform_expr(e, loop_env) for e in node.commands]), node)
+
+        elif isinstance(node, Symbol):
+            # A captured variable is read from the parameter that received it.
+            scope, entry = env.resolve(node.name)
+            if entry is LOCAL:
+                name = env.reference(scope, node.name)
+                if name != node.name:
+                    return with_pos(Symbol(name), node)
+            return node
+
         # Other atoms pass through
         return node
 
+    def _capture_args(self, func_name, captured_vars, env):
+        # The caller's own reference to each captured variable
+        args = []
+        for scope, name in captured_vars:
+            ref = env.reference(scope, name)
+            if ref is None:
+                raise Exception(f"Variable {name} captured by {func_name} is shadowed at its call")
+            args.append(Symbol(ref))
+        return args
+
     def _transform_lambda(self, lam_node, env):
-        # 1. Scan body for nested Definitions
+        # We need a new env for this lambda's body
+        # It chains to the parent env; params and local defines shadow or add entries.
+        local_env = env.extend([p.name for p in lam_node.params])
+        new_body = self._transform_body(lam_node.body, local_env)
+        return with_pos(Lambda(list(lam_node.params), new_body), lam_node)
+
+    def _transform_body(self, body, env):
+        # 1. Scan body for nested Definitions (lambda and binding-form bodies alike)
         local_defines = []
         body_exprs = []
-        
-        for expr in lam_node.body:
+
+        for expr in body:
             if isinstance(expr, Define) and isinstance(expr.value, Lambda):
-                local_defines.append(expr)
+                local_defines.append((expr.target, expr.value))
             else:
                 body_exprs.append(expr)
-        
+
         # 2. Lift each nested definition
-        current_scope_params = {p.name for p in lam_node.params}
-        
-        # We need a new env for this lambda's body
-        # It inherits from parent env, but local defines shadow or add entries.
-        local_env = env.copy()
-        
-        for def_node in local_defines:
-            name = def_node.target.name
-            nested_lam = def_node.value
-            
-            # Identify free variables in this nested lambda
-            # Free vars = vars used in body - vars defined in args - vars defined locally
-            free_vars = self._get_free_vars(nested_lam)
-            
-            # Important: The free variables must be captured from CURRENT scope.
-            # However, if 'iter' uses 'n', 'n' is a param of 'factorial'.
-            # 'n' is free in 'iter', but bound in 'factorial'.
-            # We must pass 'n' to 'iter'.
-            
-            # Sort for deterministic order
-            captured = sorted(list(free_vars))
-            
+        local_env = self._lift_functions(local_defines, env) if local_defines else env
+
+        # 3. Transform body expressions using `local_env`
+        return [self._transform_expr(e, local_env) for e in body_exprs]
+
+    def _lift_functions(self, defs, env):
+        """
+        Lifts a group of mutually visible local functions (name, Lambda) to
+        top-level definitions. Returns the scope in which calls to them are rewritten.
+        """
+        names = {target.name for target, _ in defs}
+
+        # Resolve each free name once against the enclosing scope:
+        # locals are captured, lifted functions contribute their own captures,
+        # globals and builtins (unbound) are left alone.
+        captures = {}
+        for target, lam in defs:
+            captured = set()
+            for v in self._free_vars(lam):
+                if v in names:
+                    continue
+                scope, entry = env.resolve(v)
+                if entry is LOCAL:
+                    captured.add((scope, v))
+                elif entry is not None:
+                    captured.update(entry[1])
+            captures[target.name] = captured
+
+        # A function calling a sibling must also pass along the sibling's captures.
+        changed = True
+        while changed:
+            changed = False
+            for target, lam in defs:
+                captured = captures[target.name]
+                before = len(captured)
+                for sibling in self._free_vars(lam) & names:
+                    captured |= captures[sibling]
+                changed |= len(captured) != before
+
+        bindings = {}
+        for target, _ in defs:
             # Generate new global name
             self.counter += 1
-            lifted_name = f"{name}_lifted_{self.counter}"
-            
-            # Update env for body processing: calls to 'name' -> call 'lifted_name' with 'captured'
-            local_env[name] = (lifted_name, captured)
-            
-            # Recurse: The nested lambda might itself have nested lambdas.
-            # But wait, we need to transform the nested lambda BEFORE lifting it?
-            # Or while lifting.
-            # The nested lambda's body needs to know about `local_env` + its own params.
-            # Actually, the nested lambda becomes a top-level function.
-            # It needs to handle calls to ITSELF (recursion).
-            
-            # When we lift `iter`, we transform its body.
-            # Inside `iter` body, a call to `iter` should map to `lifted_iter` with `captured`.
-            
-            # So we perform transformation on the nested lambda using an env that includes itself.
-            nested_env = local_env.copy() # includes 'iter' mapping
-            
-            # Transform the nested lambda
-            # Note: The nested lambda now needs extra params corresponding to captured vars
-            transformed_nested = self._transform_lambda(nested_lam, nested_env)
-            
+            # Sort for deterministic order
+            bindings[target.name] = (f"{target.name}_lifted_{self.counter}",
+                                     sorted(captures[target.name], key=lambda c: (c[1], c[0].depth)))
+        # Calls to 'name' -> call 'lifted_name' with 'captured'
+        local_env = Scope(env, bindings)
+
+        for target, lam in defs:
+            lifted_name, captured = bindings[target.name]
+            # Captured vars arrive in fresh params ('#' cannot occur in an identifier),
+            # so they never collide with the function's own params or locals.
+            params = {(scope, v): f"{v}#{i}" for i, (scope, v) in enumerate(captured)}
+
+            # Transform the nested lambda; it may itself have nested lambdas.
+            transformed = self._transform_lambda(lam, Scope(local_env, captures=params))
+
             # Add captured vars to params of the lifted function
-            extra_params = [Symbol(v) for v in captured]
-            transformed_nested.params.extend(extra_params)
-            
+            transformed.params.extend(Symbol(params[c]) for c in captured)
+
             # Create global definition
-            lifted_def = Define(Symbol(lifted_name), transformed_nested)
-            self.lifted_funcs.append(lifted_def)
-            
-        # 3. Transform body expressions of current lambda using `local_env`
-        new_body = [self._transform_expr(e, local_env) for e in body_exprs]
-        
-        return Lambda(lam_node.params, new_body)
+            # It keeps the source name and position of the local definition it came from
+            lifted = with_pos(Define(Symbol(lifted_name), transformed), target)
+            lifted.source_name = target.name
+            self.lifted_funcs.append(lifted)
 
-    def _get_free_vars(self, lam_node):
+        return local_env
+
+    def _is_loop(self, name, body):
         """
-        Returns set of strings (variable names) that are free in the lambda.
-        Free = Used but not defined in params or local definitions.
+        True if every reference to `name` in `body` is a call in tail position,
+        so a named let can be compiled as a loop instead of a function.
         """
-        used = set()
-        defined = set(p.name for p in lam_node.params)
-        
-        # We need a visitor to collect usage
-        def visit(node):
-            if isinstance(node, Symbol):
-                used.add(node.name)
-            elif isinstance(node, LispList):
-                for e in node.elements:
-                    visit(e)
-            elif isinstance(node, If):
-                visit(node.test)
-                visit(node.consequent)
-                if node.alternate: visit(node.alternate)
-            elif isinstance(node, Define):
-                # If we encounter a nested define (before lifting), 
-                # the target is defined in this scope.
-                # The value (Lambda) creates a new scope, handled separately?
-                # No, we are just scanning usage.
-                defined.add(node.target.name)
-                # But we don't descend into the Lambda body looking for *this* scope's free usage?
-                # Actually, vars used inside a nested lambda are used by *it*, but if they are bound *here*, they are used here too conceptually?
-                # Wait. For lifting `iter`, we need to know what `iter` needs from `factorial`.
-                # If `iter` uses `n` (param of factorial), `n` is free in `iter`.
-                pass # We handle nested Define.value (Lambda) separately below
-                
-                # Careful: We are implementing get_free_vars for `lam_node`.
-                # If `lam_node` has a nested Define `iter`, 
-                # `iter`'s body usage counts as usage for `lam_node` only if it's NOT bound by `iter`.
-                if isinstance(node.value, Lambda):
-                    # Recursive check
-                    child_free = self._get_free_vars(node.value)
-                    used.update(child_free)
-            # What if Define value is simple expr?
-            elif isinstance(node, Define):
-                 visit(node.value)
+        return self._tail_only_seq(name, body, True)
+
+    def _tail_only_seq(self, name, exprs, tail):
+        last = len(exprs) - 1
+        return all(self._tail_only(name, e, tail and i == last) for i, e in enumerate(exprs))
+
+    def _tail_only(self, name, node, tail):
+        if isinstance(node, Symbol):
+            return node.name != name
+        elif isinstance(node, LispList):
+            if not node.elements:
+                return True
+            op = node.elements[0]
+            if isinstance(op, Symbol) and op.name == name:
+                ok = tail
+            else:
+                ok = self._tail_only(name, op, False)
+            return ok and all(self._tail_only(name, a, False) for a in node.elements[1:])
+        elif isinstance(node, If):
+            return (self._tail_only(name, node.test, False)
+                    and self._tail_only(name, node.consequent, tail)
+                    and (node.alternate is None or self._tail_only(name, node.alternate, tail)))
+        elif isinstance(node, Begin):
+            return self._tail_only_seq(name, node.body, tail)
+        elif isinstance(node, Let):
+            names = {var.name for var, _ in node.bindings} | ({node.name.name} if node.name else set())
+            if not all(self._tail_only(name, init, False) for _, init in node.bindings):
+                return False
+            if name in names:
+                return True
+            # An inner named let that is not a loop itself is lifted into its own
+            # function, where a call to `name` can no longer jump back to our header.
+            if node.name is not None and not self._is_loop(node.name.name, node.body):
+                tail = False
+            return self._tail_only_seq(name, node.body, tail)
+        elif isinstance(node, (LetStar, Letrec)):
+            for var, init in node.bindings:
+                if isinstance(node, Letrec) and var.name == name:
+                    return True
+                if not self._tail_only(name, init, False):
+                    return False
+                if var.name == name:
+                    return True
+            return self._tail_only_seq(name, node.body, tail)
+        elif isinstance(node, Do):
+            if not all(self._tail_only(name, init, False) for _, init, _ in node.specs):
+                return False
+            if name in {var.name for var, _, _ in node.specs}:
+                return True
+            return (all(self._tail_only(name, step, False) for _, _, step in node.specs if step is not None)
+                    and self._tail_only(name, node.test, False)
+                    and self._tail_only_seq(name, node.commands, False)
+                    and self._tail_only_seq(name, node.result, tail))
+        elif isinstance(node, Lambda):
+            # Any reference captured by a lambda escapes the loop.
+            if name in {p.name for p in node.params}:
+                return True
+            return self._tail_only_seq(name, node.body, False)
+        elif isinstance(node, Define):
+            return self._tail_only(name, node.value, False)
+        return True
+
+    def _free_vars(self, lam_node):
+        """
+        Returns the set of names (strs) free in the lambda: used but not bound by
+        its params, local definitions or inner binding forms. Globals and builtins
+        are included; they are filtered when resolved against a Scope.
+        Results are cached, so nested lambdas are analyzed only once.
+        """
+        key = id(lam_node)
+        cached = self._free_cache.get(key)
+        if cached is not None:
+            return cached[1]
 
+        bound = {p.name for p in lam_node.params} | self._defined_names(lam_node.body)
+
+        free = set()
         for expr in lam_node.body:
-            visit(expr)
-            
-        # Global symbols (standard library) should not be captured potentially?
-        # Typically we capture everything not bound. 
-        # But we shouldn't capture '+' or 'if' or 'cons'.
-        # We need a heuristic or ignore list.
-        ignored = {'+', '-', '*', '/', '>', '<', '=', 'if', 'define', 'lambda'}
-        
-        # Filter
-        free = used - defined - ignored
-        
-        # Also remove any symbols that are actually global function names?
-        # For strictness, yes. But MVP: if it's not local, we try to capture. 
-        # If it turns out to be global, capturing it is harmless (pass global ptr), 
-        # or weird (shadowing).
-        # Let's hope users don't shadow globals for now.
-        
+            self._collect_free(expr, bound, free)
+
+        free = frozenset(free)
+        self._free_cache[key] = (lam_node, free)
         return free
+
+    def _defined_names(self, body):
+        # Names bound by the internal defines of a body
+        return {e.target.name for e in body if isinstance(e, Define)}
+
+    def _collect_free(self, node, bound, free):
+        if isinstance(node, Symbol):
+            if node.name not in bound:
+                free.add(node.name)
+        elif isinstance(node, LispList):
+            for e in node.elements:
+                self._collect_free(e, bound, free)
+        elif isinstance(node, If):
+            self._collect_free(node.test, bound, free)
+            self._collect_free(node.consequent, bound, free)
+            if node.alternate: self._collect_free(node.alternate, bound, free)
+        elif isinstance(node, Define):
+            # The target is bound by the enclosing body; only the value is scanned.
+            self._collect_free(node.value, bound, free)
+        elif isinstance(node, Lambda):
+            free.update(self._free_vars(node) - bound)
+        elif isinstance(node, Begin):
+            for e in node.body:
+                self._collect_free(e, bound, free)
+        elif isinstance(node, Let):
+            for _, init in node.bindings:
+                self._collect_free(init, bound, free)
+            inner = bound | {var.name for var, _ in node.bindings} | self._defined_names(node.body)
+            if node.name:
+                inner.add(node.name.name)
+            for e in node.body:
+                self._collect_free(e, inner, free)
+        elif isinstance(node, LetStar):
+            inner = set(bound)
+            for var, init in node.bindings:
+                self._collect_free(init, inner, free)
+                inner.add(var.name)
+            inner |= self._defined_names(node.body)
+            for e in node.body:
+                self._collect_free(e, inner, free)
+        elif isinstance(node, Letrec):
+            inner = bound | {var.name for var, _ in node.bindings}
+            for _, init in node.bindings:
+                self._collect_free(init, inner, free)
+            inner |= self._defined_names(node.body)
+            for e in node.body:
+                self._collect_free(e, inner, free)
+        elif isinstance(node, Do):
+            for _, init, _ in node.specs:
+                self._collect_free(init, bound, free)
+            inner = bound | {var.name for var, _, _ in node.specs}
+            for _, _, step in node.specs:
+                if step is not None:
+                    self._collect_free(step, inner, free)
+            self._collect_free(node.test, inner, free)
+            for e in node.result + node.commands:
+                self._collect_free(e, inner, free)
@@ -1,73 +1,190 @@
 from lark import Lark
 import sys
+import os
 import subprocess
+import tempfile
+import hashlib
+import ctypes
 import llvmlite.binding as llvm
 from ast_transformer import LispTransformer
 from codegen import CodeGen
 from lambda_lifter import LambdaLifter
+from tree_shaker import TreeShaker
+from perf_map import write_perf_map
 
-def main():
-    # ... (Keep existing grammar loading) ...
+RUNTIME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runtime")
+RUNTIME_SOURCES = ["runtime.c", "numbers.c", "bignum.c", "hash_table.c"]
+
+def load_parser():
     with open('lisp.lark', 'r') as f:
         grammar = f.read()
+    # Positions are kept on the tree for debug info (see ast_nodes.with_pos)
+    return Lark(grammar, start='start', parser='earley', propagate_positions=True)
+
+def compile_to_ir(code, parser=None, verbose=False, filename=None):
+    """
+    Runs the front end (parse -> transform -> lift -> codegen) and returns LLVM IR text.
+    With `filename`, the IR carries DWARF line info pointing into that source file.
+    """
+    return compile_program(code, parser, verbose, filename)[0]
+
+def compile_program(code, parser=None, verbose=False, filename=None):
+    """
+    Like compile_to_ir, but also returns CodeGen.function_sources: the source
+    name, file and line of each generated function (filled in with `filename`).
+    """
+    parser = parser or load_parser()
+
+    if verbose: print(f"Parsing Code...")
+    tree = parser.parse(code)
+    ast = LispTransformer().transform(tree)
+    # print("AST:", ast)
+
+    if verbose: print("Lambda Lifting...")
+    lifter = LambdaLifter()
+    ast = lifter.lift(ast)
+    # print("Lifted AST:", ast)
+
+    shaker = TreeShaker()
+    ast = shaker.shake(ast)
+    if verbose: print(shaker.report())
+
+    if verbose: print("Generating LLVM IR...")
+    codegen = CodeGen(filename)
+    return codegen.generate(ast), codegen.function_sources
+
+def optimize_module(llvm_ir, target_machine):
+    """Parses and verifies LLVM IR and runs the -O2 pipeline on it."""
+    mod = llvm.parse_assembly(llvm_ir)
+    mod.verify()
+
+    # Optimize (-O2): folds the inline fixnum tag checks and hoists them out of loops
+    pto = llvm.create_pipeline_tuning_options(speed_level=2)
+    pass_builder = llvm.create_pass_builder(target_machine, pto)
+    pass_builder.getModulePassManager().run(mod, pass_builder)
+    return mod
+
+def build_executable(llvm_ir, output="output", verbose=False, debug=False):
+    """Compiles LLVM IR to a native object and links it into `output`."""
+    if verbose: print("Compiling to Native Object...")
+    # Initialize LLVM targets
+    # llvm.initialize()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    target = llvm.Target.from_default_triple()
+    target_machine = target.create_target_machine()
+
+    # Compile IR to Module
+    mod = optimize_module(llvm_ir, target_machine)
+
+    # Emit Object Code
+    obj_code = target_machine.emit_object(mod)
+
+    obj_path = f"{output}.o"
+    with open(obj_path, "wb") as f:
+        f.write(obj_code)
+
+    if verbose: print("Linking with GCC...")
+    # Link -> create executable 'output' together with the C runtime
+    # gcc output.o runtime/*.c -o output -lm
+    runtime = [os.path.join(RUNTIME_DIR, src) for src in RUNTIME_SOURCES]
+    debug_flags = ["-g"] if debug else []
+    subprocess.run(["gcc", "-O2", *debug_flags, obj_path, *runtime, "-o", output, "-lm"], check=True)
+
+def run_jit(llvm_ir, function_sources=None, perf_map=True, verbose=False):
+    """
+    Compiles LLVM IR in memory with MCJIT and runs its `main` in this process.
+    The C runtime is built as a shared library and loaded first. With `perf_map`,
+    /tmp/perf-<pid>.map is written so `perf report` can symbolize JIT code.
+    """
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    runtime_lib = build_runtime_library(verbose)
+    llvm.load_library_permanently(runtime_lib)
 
-    parser = Lark(grammar, start='start', parser='earley')
+    target = llvm.Target.from_default_triple()
+    target_machine = target.create_target_machine(codemodel="jitdefault")
+    mod = optimize_module(llvm_ir, target_machine)
+
+    # Keep the object MCJIT loads: its symbol table gives exact function sizes
+    objects = []
+    engine = llvm.create_mcjit_compiler(mod, target_machine)
+    engine.set_object_cache(notify_func=lambda module, buf: objects.append(buf))
+    engine.finalize_object()
+
+    if perf_map:
+        path = write_perf_map(engine, mod, objects, function_sources or {})
+        if verbose: print(f"Wrote perf map {path}")
+
+    entry = ctypes.CFUNCTYPE(ctypes.c_int)(engine.get_function_address("main"))
+    status = entry()
+    # The runtime prints through C stdio; flush it before Python writes again
+    ctypes.CDLL(None).fflush(None)
+    return status
+
+def build_runtime_library(verbose=False):
+    """
+    Returns the C runtime built as a shared library for the JIT. The library is
+    cached under a path keyed by a hash of the runtime sources, so it is built
+    once per runtime version and stays available to `perf report`.
+    """
+    runtime = [os.path.join(RUNTIME_DIR, src) for src in RUNTIME_SOURCES]
+    digest = hashlib.sha256()
+    for path in runtime + [os.path.join(RUNTIME_DIR, "scheme.h")]:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    lib_path = os.path.join(tempfile.gettempdir(), f"libscheme-runtime-{digest.hexdigest()[:16]}.so")
+    if os.path.exists(lib_path):
+        return lib_path
+
+    if verbose: print("Building runtime library...")
+    # Build under a private name and rename, so concurrent runs never load a partial file
+    tmp_path = f"{lib_path}.{os.getpid()}.tmp"
+    subprocess.run(["gcc", "-O2", "-shared", "-fPIC", *runtime, "-o", tmp_path, "-lm"], check=True)
+    os.replace(tmp_path, lib_path)
+    return lib_path
+
+def main():
+    parser = load_parser()
+
+    # Flags: -g emits DWARF line info, --jit runs in memory and writes a perf map
+    args = sys.argv[1:]
+    debug = '-g' in args
+    jit = '--jit' in args
+    args = [a for a in args if a not in ('-g', '--jit')]
 
     # Example code or from CLI args
     code = "(define (fib n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))) (fib 10)"
+    filename = None
     
-    if len(sys.argv) > 1:
+    if args:
         # Check if file exists
-        if sys.argv[1].endswith('.lisp') or sys.argv[1].endswith('.scm'):
-             with open(sys.argv[1], 'r') as f:
+        if args[0].endswith('.lisp') or args[0].endswith('.scm'):
+             filename = args[0]
+             with open(filename, 'r') as f:
                  code = f.read()
         else:
-            code = sys.argv[1]
+            code = args[0]
 
-    print(f"Parsing Code...")
     try:
-        tree = parser.parse(code)
-        ast = LispTransformer().transform(tree)
-        # print("AST:", ast)
-        
-        print("Lambda Lifting...")
-        lifter = LambdaLifter()
-        ast = lifter.lift(ast)
-        
-        # print("Lifted AST:", ast)
-        
-        print("Generating LLVM IR...")
-        codegen = CodeGen()
-        llvm_ir = codegen.generate(ast)
+        # Line info needs a source file to point at
+        llvm_ir, function_sources = compile_program(code, parser, verbose=True,
+                                                    filename=filename if debug or jit else None)
         # print(llvm_ir)
         
         # Save IR for debug
         with open("output.ll", "w") as f:
             f.write(llvm_ir)
-            
-        print("Compiling to Native Object...")
-        # Initialize LLVM targets
-        # llvm.initialize() 
-        llvm.initialize_native_target()
-        llvm.initialize_native_asmprinter()
-        
-        target = llvm.Target.from_default_triple()
-        target_machine = target.create_target_machine()
-        
-        # Compile IR to Module
-        mod = llvm.parse_assembly(llvm_ir)
-        mod.verify()
-        
-        # Emit Object Code
-        obj_code = target_machine.emit_object(mod)
-        
-        with open("output.o", "wb") as f:
-            f.write(obj_code)
-            
-        print("Linking with GCC...")
-        # Link -> create executable 'output'
-        # gcc output.o -o output -lm
-        subprocess.run(["gcc", "output.o", "-o", "output", "-lm"], check=True)
+
+        if jit:
+            print("--- Execution Output (JIT) ---")
+            sys.stdout.flush()
+            run_jit(llvm_ir, function_sources, verbose=True)
+            return
+
+        build_executable(llvm_ir, "output", verbose=True, debug=debug)
         
         print("Compilation Success! Run ./output")
         print("--- Execution Output ---")
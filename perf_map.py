@@ -0,0 +1,53 @@
+import os
+import struct
+
+# ELF64 constants used to read function sizes from a relocatable object
+SHT_SYMTAB = 2
+STT_FUNC = 2
+
+def elf_function_sizes(obj):
+    """Maps function symbol names to their sizes in a little-endian ELF64 object."""
+    if obj[:4] != b"\x7fELF" or obj[4] != 2 or obj[5] != 1:
+        return {}
+    shoff, = struct.unpack_from("<Q", obj, 0x28)
+    shentsize, shnum = struct.unpack_from("<HH", obj, 0x3A)
+    sections = [struct.unpack_from("<IIQQQQIIQQ", obj, shoff + i * shentsize) for i in range(shnum)]
+
+    sizes = {}
+    for _, sh_type, _, _, offset, size, link, _, _, entsize in sections:
+        if sh_type != SHT_SYMTAB:
+            continue
+        strtab_offset = sections[link][4]
+        for pos in range(offset, offset + size, entsize):
+            st_name, st_info, _, _, _, st_size = struct.unpack_from("<IBBHQQ", obj, pos)
+            if st_info & 0xf != STT_FUNC:
+                continue
+            end = obj.index(b"\0", strtab_offset + st_name)
+            sizes[obj[strtab_offset + st_name:end].decode()] = st_size
+    return sizes
+
+def write_perf_map(engine, mod, objects, function_sources):
+    """
+    Writes /tmp/perf-<pid>.map ("START SIZE name" per line, hex) for the functions
+    MCJIT compiled, which `perf report` reads to symbolize samples in JIT code.
+    `function_sources` (CodeGen.function_sources) labels them with file:line.
+    """
+    sizes = {}
+    for obj in objects:
+        sizes.update(elf_function_sizes(obj))
+
+    path = f"/tmp/perf-{os.getpid()}.map"
+    with open(path, "w") as f:
+        for func in mod.functions:
+            if func.is_declaration:
+                continue
+            address = engine.get_function_address(func.name)
+            label = func.name
+            if func.name in function_sources:
+                source_name, filename, line = function_sources[func.name]
+                location = f"{filename}:{line}"
+                if source_name != func.name:
+                    location = f"{source_name} {location}"
+                label = f"{func.name} [{location}]"
+            f.write(f"{address:x} {sizes.get(func.name, 0):x} {label}\n")
+    return path
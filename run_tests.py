@@ -16,12 +16,12 @@ def run_test(filename):
         
         output = result.stdout
         # Extract "Result: ..." lines
-        actual_results = re.findall(r"Result: ([\d.-]+)", output)
+        actual_results = re.findall(r"Result: ([\d.-]+|#[tf])", output)
         
         # Extract expected results from comments in the scm file
         with open(filename, 'r') as f:
             content = f.read()
-        expected_results = re.findall(r";; Result: ([\d.-]+)", content)
+        expected_results = re.findall(r";; Result: ([\d.-]+|#[tf])", content)
         
         if not expected_results:
             print("[SKIPPED] (No expected results found in file)")
@@ -34,8 +34,13 @@ def run_test(filename):
         
         all_passed = True
         for i, (actual, expected) in enumerate(zip(actual_results, expected_results)):
-            # Compare floats with some tolerance
-            if abs(float(actual) - float(expected)) > 0.0001:
+            if expected.startswith("#") or re.fullmatch(r"-?\d+", expected):
+                # Booleans and exact integers must match exactly
+                passed = actual == expected
+            else:
+                # Compare floats with some tolerance
+                passed = abs(float(actual) - float(expected)) <= 0.0001
+            if not passed:
                 print(f"\n  [FAIL] at item {i+1}: expected {expected}, got {actual}")
                 all_passed = False
         
@@ -0,0 +1,271 @@
+/*
+ * Arbitrary precision integers: sign-magnitude, base 2^32 digits.
+ * Only reached when a fixnum operation overflows, so simple schoolbook
+ * algorithms are used throughout.
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "scheme.h"
+
+static scm_bignum *big_alloc(int32_t len) {
+    scm_bignum *b = scm_alloc(sizeof(scm_bignum) + sizeof(uint32_t) * (len > 0 ? len : 1));
+    b->type = SCM_BIGNUM;
+    b->sign = 1;
+    b->len = len;
+    return b;
+}
+
+static void big_trim(scm_bignum *b) {
+    while (b->len > 0 && b->digits[b->len - 1] == 0)
+        b->len--;
+    if (b->len == 0)
+        b->sign = 1;
+}
+
+scm_bignum *scm_big_from_int(int64_t n) {
+    scm_bignum *b = big_alloc(2);
+    uint64_t mag = n < 0 ? (uint64_t)0 - (uint64_t)n : (uint64_t)n;
+    b->sign = n < 0 ? -1 : 1;
+    b->digits[0] = (uint32_t)mag;
+    b->digits[1] = (uint32_t)(mag >> 32);
+    big_trim(b);
+    return b;
+}
+
+/* Magnitude comparison: -1, 0, 1 */
+static int mag_compare(const scm_bignum *a, const scm_bignum *b) {
+    if (a->len != b->len)
+        return a->len < b->len ? -1 : 1;
+    for (int32_t i = a->len - 1; i >= 0; i--) {
+        if (a->digits[i] != b->digits[i])
+            return a->digits[i] < b->digits[i] ? -1 : 1;
+    }
+    return 0;
+}
+
+static scm_bignum *mag_add(const scm_bignum *a, const scm_bignum *b) {
+    if (a->len < b->len) {
+        const scm_bignum *t = a; a = b; b = t;
+    }
+    scm_bignum *r = big_alloc(a->len + 1);
+    uint64_t carry = 0;
+    for (int32_t i = 0; i < a->len; i++) {
+        uint64_t sum = (uint64_t)a->digits[i] + (i < b->len ? b->digits[i] : 0) + carry;
+        r->digits[i] = (uint32_t)sum;
+        carry = sum >> 32;
+    }
+    r->digits[a->len] = (uint32_t)carry;
+    big_trim(r);
+    return r;
+}
+
+/* |a| - |b|, requires |a| >= |b| */
+static scm_bignum *mag_sub(const scm_bignum *a, const scm_bignum *b) {
+    scm_bignum *r = big_alloc(a->len);
+    int64_t borrow = 0;
+    for (int32_t i = 0; i < a->len; i++) {
+        int64_t diff = (int64_t)a->digits[i] - (i < b->len ? b->digits[i] : 0) - borrow;
+        borrow = diff < 0;
+        r->digits[i] = (uint32_t)(diff + (borrow << 32));
+    }
+    big_trim(r);
+    return r;
+}
+
+static scm_bignum *signed_add(const scm_bignum *a, const scm_bignum *b, int b_sign) {
+    scm_bignum *r;
+    if (a->sign == b_sign) {
+        r = mag_add(a, b);
+        r->sign = a->sign;
+    } else if (mag_compare(a, b) >= 0) {
+        r = mag_sub(a, b);
+        r->sign = a->sign;
+    } else {
+        r = mag_sub(b, a);
+        r->sign = b_sign;
+    }
+    big_trim(r);
+    return r;
+}
+
+scm_bignum *scm_big_add(const scm_bignum *a, const scm_bignum *b) {
+    return signed_add(a, b, b->sign);
+}
+
+scm_bignum *scm_big_sub(const scm_bignum *a, const scm_bignum *b) {
+    return signed_add(a, b, -b->sign);
+}
+
+scm_bignum *scm_big_mul(const scm_bignum *a, const scm_bignum *b) {
+    scm_bignum *r = big_alloc(a->len + b->len);
+    memset(r->digits, 0, sizeof(uint32_t) * (a->len + b->len));
+    for (int32_t i = 0; i < a->len; i++) {
+        uint64_t carry = 0;
+        uint64_t ai = a->digits[i];
+        for (int32_t j = 0; j < b->len; j++) {
+            uint64_t cur = ai * b->digits[j] + r->digits[i + j] + carry;
+            r->digits[i + j] = (uint32_t)cur;
+            carry = cur >> 32;
+        }
+        r->digits[i + b->len] = (uint32_t)carry;
+    }
+    r->sign = a->sign * b->sign;
+    big_trim(r);
+    return r;
+}
+
+int scm_big_compare(const scm_bignum *a, const scm_bignum *b) {
+    if (a->sign != b->sign)
+        return a->sign < b->sign ? -1 : 1;
+    return a->sign * mag_compare(a, b);
+}
+
+/* Divides |a| by d; returns the remainder and stores the quotient (same sign). */
+uint32_t scm_big_divmod_small(const scm_bignum *a, uint32_t d, scm_bignum **quotient) {
+    scm_bignum *q = big_alloc(a->len);
+    uint64_t rem = 0;
+    for (int32_t i = a->len - 1; i >= 0; i--) {
+        uint64_t cur = (rem << 32) | a->digits[i];
+        q->digits[i] = (uint32_t)(cur / d);
+        rem = cur % d;
+    }
+    q->sign = a->sign;
+    big_trim(q);
+    if (quotient)
+        *quotient = q;
+    return (uint32_t)rem;
+}
+
+/*
+ * Truncating division of a by b (b != 0), Knuth's algorithm D. Returns the
+ * quotient (sign a * b) and stores the remainder (sign of a) if requested.
+ */
+scm_bignum *scm_big_divmod(const scm_bignum *a, const scm_bignum *b, scm_bignum **remainder) {
+    scm_bignum *q, *r;
+    if (mag_compare(a, b) < 0) {
+        q = big_alloc(0);
+        r = big_alloc(a->len);
+        memcpy(r->digits, a->digits, sizeof(uint32_t) * a->len);
+        r->sign = a->sign;
+    } else if (b->len == 1) {
+        r = scm_big_from_int(scm_big_divmod_small(a, b->digits[0], &q));
+        q->sign = a->sign * b->sign;
+        r->sign = a->sign;
+    } else {
+        /* Normalize so the divisor's top digit has its high bit set */
+        int32_t n = b->len, m = a->len - b->len;
+        int shift = __builtin_clz(b->digits[n - 1]);
+        uint32_t *v = malloc(sizeof(uint32_t) * n);
+        uint32_t *u = malloc(sizeof(uint32_t) * (a->len + 1));
+        for (int32_t i = n - 1; i > 0; i--)
+            v[i] = (b->digits[i] << shift) | (shift ? (uint32_t)((uint64_t)b->digits[i - 1] >> (32 - shift)) : 0);
+        v[0] = b->digits[0] << shift;
+        u[a->len] = shift ? (uint32_t)((uint64_t)a->digits[a->len - 1] >> (32 - shift)) : 0;
+        for (int32_t i = a->len - 1; i > 0; i--)
+            u[i] = (a->digits[i] << shift) | (shift ? (uint32_t)((uint64_t)a->digits[i - 1] >> (32 - shift)) : 0);
+        u[0] = a->digits[0] << shift;
+
+        q = big_alloc(m + 1);
+        for (int32_t j = m; j >= 0; j--) {
+            /* Estimate the quotient digit from the top two digits, then correct */
+            uint64_t num = ((uint64_t)u[j + n] << 32) | u[j + n - 1];
+            uint64_t qhat = num / v[n - 1], rhat = num % v[n - 1];
+            while (qhat > 0xffffffffu || qhat * v[n - 2] > ((rhat << 32) | u[j + n - 2])) {
+                qhat--;
+                rhat += v[n - 1];
+                if (rhat > 0xffffffffu)
+                    break;
+            }
+            /* u[j..j+n] -= qhat * v */
+            int64_t borrow = 0;
+            uint64_t carry = 0;
+            for (int32_t i = 0; i < n; i++) {
+                uint64_t p = qhat * v[i] + carry;
+                carry = p >> 32;
+                int64_t t = (int64_t)u[i + j] - borrow - (int64_t)(uint32_t)p;
+                u[i + j] = (uint32_t)t;
+                borrow = t < 0;
+            }
+            int64_t t = (int64_t)u[j + n] - borrow - (int64_t)carry;
+            u[j + n] = (uint32_t)t;
+            if (t < 0) {
+                /* qhat was one too large: add v back */
+                qhat--;
+                uint64_t c = 0;
+                for (int32_t i = 0; i < n; i++) {
+                    uint64_t sum = (uint64_t)u[i + j] + v[i] + c;
+                    u[i + j] = (uint32_t)sum;
+                    c = sum >> 32;
+                }
+                u[j + n] += (uint32_t)c;
+            }
+            q->digits[j] = (uint32_t)qhat;
+        }
+
+        /* Unnormalize the remainder */
+        r = big_alloc(n);
+        for (int32_t i = 0; i < n; i++)
+            r->digits[i] = (u[i] >> shift) | (shift ? (uint32_t)((uint64_t)u[i + 1] << (32 - shift)) : 0);
+        free(u);
+        free(v);
+        q->sign = a->sign * b->sign;
+        r->sign = a->sign;
+    }
+    big_trim(q);
+    big_trim(r);
+    if (remainder)
+        *remainder = r;
+    return q;
+}
+
+/* Returns a fixnum when the value fits, the bignum otherwise. */
+scm_obj scm_big_normalize(scm_bignum *x) {
+    if (x->len <= 2) {
+        uint64_t mag = x->len == 0 ? 0 : x->digits[0];
+        if (x->len == 2)
+            mag |= (uint64_t)x->digits[1] << 32;
+        if (x->sign > 0 && mag <= (uint64_t)SCM_FIXNUM_MAX)
+            return SCM_MAKE_FIXNUM((int64_t)mag);
+        if (x->sign < 0 && mag <= (uint64_t)SCM_FIXNUM_MAX + 1)
+            return SCM_MAKE_FIXNUM(-(int64_t)mag);
+    }
+    return SCM_FROM_HEAP(x);
+}
+
+double scm_big_to_double(const scm_bignum *a) {
+    double r = 0.0;
+    for (int32_t i = a->len - 1; i >= 0; i--)
+        r = r * 4294967296.0 + a->digits[i];
+    return a->sign * r;
+}
+
+void scm_big_write(FILE *out, const scm_bignum *a) {
+    if (a->len == 0) {
+        fputs("0", out);
+        return;
+    }
+    /* Peel off base 10^9 chunks, least significant first, dividing a scratch copy in place */
+    int32_t len = a->len, count = 0;
+    uint32_t *mag = malloc(sizeof(uint32_t) * len);
+    uint32_t *chunks = malloc(sizeof(uint32_t) * (len * 10 / 9 + 2));
+    memcpy(mag, a->digits, sizeof(uint32_t) * len);
+    do {
+        uint64_t rem = 0;
+        for (int32_t i = len - 1; i >= 0; i--) {
+            uint64_t cur = (rem << 32) | mag[i];
+            mag[i] = (uint32_t)(cur / 1000000000u);
+            rem = cur % 1000000000u;
+        }
+        chunks[count++] = (uint32_t)rem;
+        while (len > 0 && mag[len - 1] == 0)
+            len--;
+    } while (len > 0);
+    if (a->sign < 0)
+        fputs("-", out);
+    fprintf(out, "%u", chunks[count - 1]);
+    for (int32_t i = count - 2; i >= 0; i--)
+        fprintf(out, "%09u", chunks[i]);
+    free(mag);
+    free(chunks);
+}
@@ -0,0 +1,218 @@
+/*
+ * Hash tables: open addressing with Robin Hood probing and backward-shift
+ * deletion (no tombstones). Capacity is a power of two and the home slot is
+ * the top bits of the hash, so hashes only need good high bits.
+ *
+ * Codegen computes the hash of fixnum, immediate and symbol keys inline
+ * (word * SCM_HASH_MULTIPLIER; symbols are interned, so the word is the
+ * identity) and passes it in; every other key goes through scm_hash.
+ */
+#include <stdlib.h>
+#include <string.h>
+#include "scheme.h"
+
+#define INITIAL_CAPACITY 8
+/* Grow past 7/8 full; Robin Hood keeps probe sequences short up to there */
+#define MAX_LOAD_NUM 7
+#define MAX_LOAD_DEN 8
+/* Probe distances live in the low 16 bits of `meta`; reaching the limit forces a resize */
+#define DIST_MASK 0xffffull
+#define MAX_DIST 0xffff
+
+#define DIST(e) ((uint32_t)((e)->meta & DIST_MASK))
+#define HASH_BITS(hash) ((hash) & ~DIST_MASK)
+
+static uint64_t hash_bytes(const void *data, size_t length, uint64_t h) {
+    /* FNV-1a */
+    const unsigned char *p = data;
+    for (size_t i = 0; i < length; i++) {
+        h ^= p[i];
+        h *= 0x100000001b3ull;
+    }
+    return h;
+}
+
+uint64_t scm_hash(scm_obj key) {
+    switch (scm_type_of(key)) {
+    case SCM_STRING: {
+        scm_string *s = (scm_string *)SCM_HEAP(key);
+        return hash_bytes(s->data, (size_t)s->length, 0xcbf29ce484222325ull) * SCM_HASH_MULTIPLIER;
+    }
+    case SCM_BIGNUM: {
+        scm_bignum *b = (scm_bignum *)SCM_HEAP(key);
+        uint64_t h = hash_bytes(&b->sign, sizeof(b->sign), 0xcbf29ce484222325ull);
+        return hash_bytes(b->digits, (size_t)b->len * sizeof(uint32_t), h) * SCM_HASH_MULTIPLIER;
+    }
+    case SCM_FLONUM: {
+        double value = ((scm_flonum *)SCM_HEAP(key))->value;
+        return hash_bytes(&value, sizeof(value), 0xcbf29ce484222325ull) * SCM_HASH_MULTIPLIER;
+    }
+    default:
+        /* Fixnums, immediates, symbols and other objects by identity */
+        return (uint64_t)key * SCM_HASH_MULTIPLIER;
+    }
+}
+
+/* Keys that are not the same word can only be equal if both are boxed */
+static int boxed_keys_equal(scm_obj a, scm_obj b) {
+    int64_t type = scm_type_of(a);
+    if (type == 0 || type != scm_type_of(b))
+        return 0;
+    if (type == SCM_STRING) {
+        scm_string *x = (scm_string *)SCM_HEAP(a), *y = (scm_string *)SCM_HEAP(b);
+        return x->length == y->length && memcmp(x->data, y->data, (size_t)x->length) == 0;
+    }
+    if (type == SCM_BIGNUM)
+        return scm_big_compare((scm_bignum *)SCM_HEAP(a), (scm_bignum *)SCM_HEAP(b)) == 0;
+    if (type == SCM_FLONUM)
+        /* Same bits, like eqv? and scm_hash: NaN finds itself, 0.0 and -0.0 differ */
+        return memcmp(&((scm_flonum *)SCM_HEAP(a))->value, &((scm_flonum *)SCM_HEAP(b))->value,
+                      sizeof(double)) == 0;
+    return 0;
+}
+
+static void allocate_slots(scm_hash_table *t, int64_t capacity) {
+    t->capacity = capacity;
+    t->shift = 64 - __builtin_ctzll((unsigned long long)capacity);
+    /* Zeroed memory is a table of empty slots */
+    t->entries = calloc((size_t)capacity, sizeof(scm_hash_entry));
+    if (!t->entries)
+        scm_error("hash table: out of memory", SCM_MAKE_FIXNUM(capacity));
+}
+
+scm_obj scm_make_hash_table(void) {
+    scm_hash_table *t = scm_alloc(sizeof(scm_hash_table));
+    t->type = SCM_HASH_TABLE;
+    t->count = 0;
+    allocate_slots(t, INITIAL_CAPACITY);
+    return SCM_FROM_HEAP(t);
+}
+
+static scm_hash_table *check_table(scm_obj x) {
+    if (scm_type_of(x) != SCM_HASH_TABLE)
+        scm_error("not a hash table:", x);
+    return (scm_hash_table *)SCM_HEAP(x);
+}
+
+/* Slot holding `key`, or -1. Robin Hood lets the probe stop at the first
+   slot whose entry is closer to home than we are. */
+static int64_t find_slot(const scm_hash_table *t, scm_obj key, uint64_t hash) {
+    int64_t mask = t->capacity - 1;
+    int64_t i = (int64_t)(hash >> t->shift);
+    uint64_t bits = HASH_BITS(hash);
+    for (uint32_t d = 1;; d++, i = (i + 1) & mask) {
+        const scm_hash_entry *e = &t->entries[i];
+        if (DIST(e) < d)
+            return -1;
+        if (HASH_BITS(e->meta) == bits && (e->key == key || boxed_keys_equal(e->key, key)))
+            return i;
+    }
+}
+
+static void grow(scm_hash_table *t);
+
+/* Inserts an entry known to be absent; its meta holds the hash bits only */
+static void insert_new(scm_hash_table *t, scm_hash_entry entry) {
+    int64_t mask = t->capacity - 1;
+    int64_t i = (int64_t)(entry.meta >> t->shift);
+    uint32_t d = 1;
+    for (;;) {
+        scm_hash_entry *slot = &t->entries[i];
+        if (DIST(slot) == 0) {
+            entry.meta |= d;
+            *slot = entry;
+            return;
+        }
+        if (DIST(slot) < d) {
+            /* Take the slot from the richer entry and carry it forward */
+            scm_hash_entry displaced = *slot;
+            entry.meta |= d;
+            *slot = entry;
+            d = DIST(&displaced);
+            displaced.meta = HASH_BITS(displaced.meta);
+            entry = displaced;
+        }
+        i = (i + 1) & mask;
+        if (++d == MAX_DIST) {
+            /* Only keys with identical hashes can make a sparse table this long */
+            if (t->count * 8 < t->capacity)
+                scm_error("hash table: too many keys with the same hash:", SCM_MAKE_FIXNUM(t->count));
+            grow(t);
+            insert_new(t, entry);
+            return;
+        }
+    }
+}
+
+static void grow(scm_hash_table *t) {
+    int64_t old_capacity = t->capacity;
+    scm_hash_entry *old_entries = t->entries;
+
+    /* Stored hash bits make rehashing a plain reinsert */
+    allocate_slots(t, old_capacity * 2);
+    for (int64_t i = 0; i < old_capacity; i++) {
+        scm_hash_entry entry = old_entries[i];
+        if (DIST(&entry)) {
+            entry.meta = HASH_BITS(entry.meta);
+            insert_new(t, entry);
+        }
+    }
+    free(old_entries);
+}
+
+scm_obj scm_hash_table_ref(scm_obj table, scm_obj key, uint64_t hash) {
+    scm_hash_table *t = check_table(table);
+    int64_t i = find_slot(t, key, hash);
+    if (i < 0)
+        scm_error("hash-table-ref: no value for key", key);
+    return t->entries[i].value;
+}
+
+scm_obj scm_hash_table_ref_default(scm_obj table, scm_obj key, uint64_t hash, scm_obj fallback) {
+    scm_hash_table *t = check_table(table);
+    int64_t i = find_slot(t, key, hash);
+    return i < 0 ? fallback : t->entries[i].value;
+}
+
+scm_obj scm_hash_table_contains(scm_obj table, scm_obj key, uint64_t hash) {
+    return find_slot(check_table(table), key, hash) < 0 ? SCM_FALSE : SCM_TRUE;
+}
+
+scm_obj scm_hash_table_set(scm_obj table, scm_obj key, uint64_t hash, scm_obj value) {
+    scm_hash_table *t = check_table(table);
+    int64_t i = find_slot(t, key, hash);
+    if (i >= 0) {
+        t->entries[i].value = value;
+        return SCM_UNSPECIFIED;
+    }
+    if ((t->count + 1) * MAX_LOAD_DEN > t->capacity * MAX_LOAD_NUM)
+        grow(t);
+    scm_hash_entry entry = {HASH_BITS(hash), key, value};
+    insert_new(t, entry);
+    t->count++;
+    return SCM_UNSPECIFIED;
+}
+
+scm_obj scm_hash_table_delete(scm_obj table, scm_obj key, uint64_t hash) {
+    scm_hash_table *t = check_table(table);
+    int64_t i = find_slot(t, key, hash);
+    if (i < 0)
+        return SCM_UNSPECIFIED;
+
+    /* Backward shift: pull the following displaced entries one slot closer */
+    int64_t mask = t->capacity - 1;
+    int64_t next = (i + 1) & mask;
+    while (DIST(&t->entries[next]) > 1) {
+        t->entries[i] = t->entries[next];
+        t->entries[i].meta--;
+        i = next;
+        next = (next + 1) & mask;
+    }
+    t->entries[i].meta = 0;
+    t->count--;
+    return SCM_UNSPECIFIED;
+}
+
+scm_obj scm_hash_table_size(scm_obj table) {
+    return SCM_MAKE_FIXNUM(check_table(table)->count);
+}
@@ -0,0 +1,121 @@
+/*
+ * Generic arithmetic. Codegen inlines the fixnum case with overflow checks and
+ * only calls these functions when an operand is not a fixnum or the result
+ * overflowed 63 bits. Integers stay exact (fixnum or bignum); any flonum
+ * operand makes the result inexact.
+ */
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "scheme.h"
+
+scm_obj scm_make_flonum(double value) {
+    scm_flonum *f = scm_alloc(sizeof(scm_flonum));
+    f->type = SCM_FLONUM;
+    f->value = value;
+    return SCM_FROM_HEAP(f);
+}
+
+static void check_number(scm_obj x) {
+    if (!SCM_IS_FIXNUM(x) && scm_type_of(x) != SCM_BIGNUM && scm_type_of(x) != SCM_FLONUM)
+        scm_error("not a number:", x);
+}
+
+static int is_flonum(scm_obj x) {
+    return scm_type_of(x) == SCM_FLONUM;
+}
+
+static double to_double(scm_obj x) {
+    if (SCM_IS_FIXNUM(x))
+        return (double)SCM_FIXNUM(x);
+    if (scm_type_of(x) == SCM_BIGNUM)
+        return scm_big_to_double((scm_bignum *)SCM_HEAP(x));
+    return ((scm_flonum *)SCM_HEAP(x))->value;
+}
+
+static scm_bignum *to_big(scm_obj x) {
+    if (SCM_IS_FIXNUM(x))
+        return scm_big_from_int(SCM_FIXNUM(x));
+    return (scm_bignum *)SCM_HEAP(x);
+}
+
+scm_obj scm_add(scm_obj a, scm_obj b) {
+    check_number(a);
+    check_number(b);
+    if (is_flonum(a) || is_flonum(b))
+        return scm_make_flonum(to_double(a) + to_double(b));
+    return scm_big_normalize(scm_big_add(to_big(a), to_big(b)));
+}
+
+scm_obj scm_sub(scm_obj a, scm_obj b) {
+    check_number(a);
+    check_number(b);
+    if (is_flonum(a) || is_flonum(b))
+        return scm_make_flonum(to_double(a) - to_double(b));
+    return scm_big_normalize(scm_big_sub(to_big(a), to_big(b)));
+}
+
+scm_obj scm_mul(scm_obj a, scm_obj b) {
+    check_number(a);
+    check_number(b);
+    if (is_flonum(a) || is_flonum(b))
+        return scm_make_flonum(to_double(a) * to_double(b));
+    return scm_big_normalize(scm_big_mul(to_big(a), to_big(b)));
+}
+
+/*
+ * Exact division yields an integer when it divides evenly. There are no
+ * rationals yet, so an inexact quotient becomes a flonum.
+ */
+scm_obj scm_div(scm_obj a, scm_obj b) {
+    check_number(a);
+    check_number(b);
+    if (is_flonum(a) || is_flonum(b))
+        return scm_make_flonum(to_double(a) / to_double(b));
+    if (b == SCM_MAKE_FIXNUM(0))
+        scm_error("division by zero:", a);
+    if (SCM_IS_FIXNUM(a) && SCM_IS_FIXNUM(b)) {
+        int64_t x = SCM_FIXNUM(a), y = SCM_FIXNUM(b);
+        if (x % y == 0)
+            return scm_big_normalize(scm_big_from_int(x / y)); /* min / -1 overflows */
+        return scm_make_flonum((double)x / (double)y);
+    }
+    scm_bignum *r;
+    scm_bignum *q = scm_big_divmod(to_big(a), to_big(b), &r);
+    if (r->len == 0)
+        return scm_big_normalize(q);
+    return scm_make_flonum(to_double(a) / to_double(b));
+}
+
+int64_t scm_compare(scm_obj a, scm_obj b) {
+    check_number(a);
+    check_number(b);
+    if (SCM_IS_FIXNUM(a) && SCM_IS_FIXNUM(b))
+        return (a > b) - (a < b);
+    if (is_flonum(a) || is_flonum(b)) {
+        double x = to_double(a), y = to_double(b);
+        if (isnan(x) || isnan(y))
+            return SCM_UNORDERED;
+        return (x > y) - (x < y);
+    }
+    return scm_big_compare(to_big(a), to_big(b));
+}
+
+void scm_write_number(FILE *out, scm_obj x) {
+    if (SCM_IS_FIXNUM(x)) {
+        fprintf(out, "%lld", (long long)SCM_FIXNUM(x));
+    } else if (scm_type_of(x) == SCM_BIGNUM) {
+        scm_big_write(out, (scm_bignum *)SCM_HEAP(x));
+    } else {
+        /* Shortest representation that reads back, always with a decimal point */
+        double v = ((scm_flonum *)SCM_HEAP(x))->value;
+        char buf[64];
+        snprintf(buf, sizeof buf, "%.15g", v);
+        if (strtod(buf, NULL) != v)
+            snprintf(buf, sizeof buf, "%.17g", v);
+        if (isfinite(v) && !strpbrk(buf, ".e"))
+            strcat(buf, ".0");
+        fputs(buf, out);
+    }
+}
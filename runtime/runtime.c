@@ -0,0 +1,97 @@
+/*
+ * Core runtime: allocation, errors and printing of top-level results.
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include "scheme.h"
+
+void *scm_alloc(int64_t size) {
+    /* malloc is 16-byte aligned, which keeps the low pointer bits free for tags */
+    void *p = malloc((size_t)size);
+    if (!p) {
+        fputs("Error: out of memory\n", stderr);
+        exit(1);
+    }
+    return p;
+}
+
+void scm_error(const char *message, scm_obj irritant) {
+    fflush(stdout);
+    fprintf(stderr, "Error: %s ", message);
+    scm_write(stderr, irritant);
+    fputs("\n", stderr);
+    exit(1);
+}
+
+static void write_string(FILE *out, const scm_string *s) {
+    fputc('"', out);
+    for (int64_t i = 0; i < s->length; i++) {
+        char c = s->data[i];
+        if (c == '"' || c == '\\')
+            fputc('\\', out);
+        if (c == '\n')
+            fputs("\\n", out);
+        else
+            fputc(c, out);
+    }
+    fputc('"', out);
+}
+
+static void write_list(FILE *out, scm_obj x) {
+    fputc('(', out);
+    scm_write(out, ((scm_pair *)SCM_HEAP(x))->car);
+    x = ((scm_pair *)SCM_HEAP(x))->cdr;
+    while (scm_type_of(x) == SCM_PAIR) {
+        fputc(' ', out);
+        scm_write(out, ((scm_pair *)SCM_HEAP(x))->car);
+        x = ((scm_pair *)SCM_HEAP(x))->cdr;
+    }
+    if (x != SCM_NIL) {
+        fputs(" . ", out);
+        scm_write(out, x);
+    }
+    fputc(')', out);
+}
+
+void scm_write(FILE *out, scm_obj x) {
+    if (x == SCM_FALSE) {
+        fputs("#f", out);
+    } else if (x == SCM_TRUE) {
+        fputs("#t", out);
+    } else if (x == SCM_NIL) {
+        fputs("()", out);
+    } else if (x == SCM_UNSPECIFIED) {
+        fputs("#<unspecified>", out);
+    } else if (SCM_IS_FIXNUM(x) || scm_type_of(x) == SCM_BIGNUM || scm_type_of(x) == SCM_FLONUM) {
+        scm_write_number(out, x);
+    } else if (scm_type_of(x) == SCM_STRING) {
+        write_string(out, (scm_string *)SCM_HEAP(x));
+    } else if (scm_type_of(x) == SCM_SYMBOL) {
+        fputs(((scm_string *)SCM_HEAP(((scm_symbol *)SCM_HEAP(x))->name))->data, out);
+    } else if (scm_type_of(x) == SCM_PAIR) {
+        write_list(out, x);
+    } else if (scm_type_of(x) == SCM_HASH_TABLE) {
+        fprintf(out, "#<hash-table %lld>", (long long)((scm_hash_table *)SCM_HEAP(x))->count);
+    } else {
+        fprintf(out, "#<object 0x%llx>", (unsigned long long)x);
+    }
+}
+
+void scm_print_result(scm_obj x) {
+    fputs("Result: ", stdout);
+    scm_write(stdout, x);
+    fputs("\n", stdout);
+}
+
+/* Slow paths of the inline car/cdr: only reached for non-pairs */
+scm_obj scm_car(scm_obj x) {
+    if (scm_type_of(x) != SCM_PAIR)
+        scm_error("car: not a pair:", x);
+    return ((scm_pair *)SCM_HEAP(x))->car;
+}
+
+scm_obj scm_cdr(scm_obj x) {
+    if (scm_type_of(x) != SCM_PAIR)
+        scm_error("cdr: not a pair:", x);
+    return ((scm_pair *)SCM_HEAP(x))->cdr;
+}
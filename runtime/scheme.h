@@ -0,0 +1,153 @@
+/*
+ * Scheme runtime: value representation shared with codegen.py.
+ *
+ * Every Scheme value is a 64-bit word (scm_obj):
+ *
+ *   ...xxxxxxx0   fixnum, 63-bit signed integer stored as (n << 1)
+ *   ...ppppp001   pointer to an 8-byte aligned heap object, plus 1
+ *   ...nnnnn011   immediate constant (#f, #t, '(), unspecified)
+ *
+ * Heap objects start with a 64-bit type tag. Nothing is freed yet (no GC).
+ * Literal data (strings, symbols, quoted lists, numbers) is emitted by the
+ * codegen constant pool as read-only globals with the same layouts and must
+ * never be mutated. Keep the constants below in sync with codegen.py.
+ */
+#ifndef SCHEME_H
+#define SCHEME_H
+
+#include <stdint.h>
+#include <stdio.h>
+
+typedef int64_t scm_obj;
+
+#define SCM_FIXNUM_MIN (-((int64_t)1 << 62))
+#define SCM_FIXNUM_MAX (((int64_t)1 << 62) - 1)
+
+#define SCM_IS_FIXNUM(x) (((x) & 1) == 0)
+#define SCM_FIXNUM(x) ((x) >> 1)
+#define SCM_MAKE_FIXNUM(n) ((scm_obj)((uint64_t)(n) << 1))
+
+#define SCM_IS_HEAP(x) (((x) & 7) == 1)
+#define SCM_HEAP(x) ((scm_heap *)((x) - 1))
+#define SCM_FROM_HEAP(p) ((scm_obj)(intptr_t)(p) + 1)
+
+#define SCM_FALSE ((scm_obj)0x03)
+#define SCM_TRUE ((scm_obj)0x0b)
+#define SCM_NIL ((scm_obj)0x13)
+#define SCM_UNSPECIFIED ((scm_obj)0x1b)
+
+enum scm_type {
+    SCM_BIGNUM = 1,
+    SCM_FLONUM = 2,
+    SCM_STRING = 3,
+    SCM_SYMBOL = 4,
+    SCM_PAIR = 5,
+    SCM_HASH_TABLE = 6,
+};
+
+typedef struct {
+    int64_t type;
+} scm_heap;
+
+typedef struct {
+    int64_t type;
+    double value;
+} scm_flonum;
+
+/* NUL-terminated; length excludes the terminator */
+typedef struct {
+    int64_t type;
+    int64_t length;
+    char data[];
+} scm_string;
+
+/* Interned at compile time: equal names are the same object */
+typedef struct {
+    int64_t type;
+    scm_obj name; /* a string */
+} scm_symbol;
+
+typedef struct {
+    int64_t type;
+    scm_obj car;
+    scm_obj cdr;
+} scm_pair;
+
+/* Sign-magnitude integer, little-endian base 2^32 digits, no leading zeros. */
+typedef struct {
+    int64_t type;
+    int32_t sign; /* 1 or -1 */
+    int32_t len;
+    uint32_t digits[];
+} scm_bignum;
+
+/*
+ * Open-addressing hash table with Robin Hood probing. Each slot keeps the
+ * high bits of its key's hash and, in the low 16 bits, the probe distance + 1
+ * from the home slot (hash >> shift); 0 marks an empty slot. Keeping both in
+ * one word means a probe touches a single cache line. Keys compare like
+ * eqv?, plus string contents.
+ */
+typedef struct {
+    uint64_t meta; /* (hash & ~0xffff) | (distance + 1) */
+    scm_obj key;
+    scm_obj value;
+} scm_hash_entry;
+
+typedef struct {
+    int64_t type;
+    int64_t count;
+    int64_t capacity; /* power of two */
+    int64_t shift;    /* 64 - log2(capacity) */
+    scm_hash_entry *entries;
+} scm_hash_table;
+
+/* Fibonacci hashing: codegen inlines this for fixnums, immediates and symbols */
+#define SCM_HASH_MULTIPLIER 0x9E3779B97F4A7C15ull
+
+static inline int64_t scm_type_of(scm_obj x) {
+    return SCM_IS_HEAP(x) ? SCM_HEAP(x)->type : 0;
+}
+
+/* runtime.c */
+void *scm_alloc(int64_t size);
+void scm_error(const char *message, scm_obj irritant);
+void scm_write(FILE *out, scm_obj x);
+void scm_print_result(scm_obj x);
+scm_obj scm_car(scm_obj x);
+scm_obj scm_cdr(scm_obj x);
+
+/* numbers.c: generic slow paths, called when the inline fixnum path fails */
+scm_obj scm_make_flonum(double value);
+scm_obj scm_add(scm_obj a, scm_obj b);
+scm_obj scm_sub(scm_obj a, scm_obj b);
+scm_obj scm_mul(scm_obj a, scm_obj b);
+scm_obj scm_div(scm_obj a, scm_obj b);
+/* -1, 0 or 1; SCM_UNORDERED when a NaN makes =, < and > all false */
+#define SCM_UNORDERED 2
+int64_t scm_compare(scm_obj a, scm_obj b);
+void scm_write_number(FILE *out, scm_obj x);
+
+/* hash_table.c: `hash` is scm_hash(key), computed inline by codegen when it can */
+scm_obj scm_make_hash_table(void);
+uint64_t scm_hash(scm_obj key);
+scm_obj scm_hash_table_ref(scm_obj table, scm_obj key, uint64_t hash);
+scm_obj scm_hash_table_ref_default(scm_obj table, scm_obj key, uint64_t hash, scm_obj fallback);
+scm_obj scm_hash_table_set(scm_obj table, scm_obj key, uint64_t hash, scm_obj value);
+scm_obj scm_hash_table_delete(scm_obj table, scm_obj key, uint64_t hash);
+scm_obj scm_hash_table_contains(scm_obj table, scm_obj key, uint64_t hash);
+scm_obj scm_hash_table_size(scm_obj table);
+
+/* bignum.c */
+scm_bignum *scm_big_from_int(int64_t n);
+scm_obj scm_big_normalize(scm_bignum *x);
+scm_bignum *scm_big_add(const scm_bignum *a, const scm_bignum *b);
+scm_bignum *scm_big_sub(const scm_bignum *a, const scm_bignum *b);
+scm_bignum *scm_big_mul(const scm_bignum *a, const scm_bignum *b);
+int scm_big_compare(const scm_bignum *a, const scm_bignum *b);
+uint32_t scm_big_divmod_small(const scm_bignum *a, uint32_t d, scm_bignum **quotient);
+scm_bignum *scm_big_divmod(const scm_bignum *a, const scm_bignum *b, scm_bignum **remainder);
+double scm_big_to_double(const scm_bignum *a);
+void scm_big_write(FILE *out, const scm_bignum *a);
+
+#endif
@@ -0,0 +1,48 @@
+;;; NIVEL 10: Enteros Exactos (Fixnums y Bignums)
+;;; Aritmética entera exacta: fixnums de 63 bits con promoción a bignum al desbordar.
+
+(define (factorial n)
+  (if (< n 2)
+      1
+      (* n (factorial (- n 1)))))
+
+;;; 25! supera 2^63: requiere bignums
+(factorial 25)
+;; Result: 15511210043330985984000000
+
+;;; Más allá de 2^53 los doubles pierden precisión
+(+ 9007199254740992 1)
+;; Result: 9007199254740993
+
+;;; Desbordamiento de fixnum (2^62) y vuelta a fixnum
+(- (+ 4611686018427387903 1) 1)
+;; Result: 4611686018427387903
+
+(- (factorial 30) (* 30 (factorial 29)))
+;; Result: 0
+
+(< (factorial 21) (factorial 22))
+;; Result: #t
+
+(/ 100 4)
+;; Result: 25
+
+;;; División exacta con divisores grandes (fixnum > 2^32 y bignum)
+(/ (* 10000000000 10000000000) 10000000000)
+;; Result: 10000000000
+
+(/ (factorial 30) (factorial 28))
+;; Result: 870
+
+;;; NaN no está ordenado: =, < y > son falsos
+(= (/ 0.0 0.0) (/ 0.0 0.0))
+;; Result: #f
+
+(= (/ 0.0 0.0) 1)
+;; Result: #f
+
+(< (/ 0.0 0.0) 1)
+;; Result: #f
+
+(> 1 (/ 0.0 0.0))
+;; Result: #f
@@ -0,0 +1,43 @@
+;;; NIVEL 11: Datos Citados, Símbolos y Strings (Pool de Constantes)
+;;; Los literales se emiten una sola vez como globales de solo lectura;
+;;; los símbolos se internan en compilación, así que eq? compara palabras.
+
+(eq? 'manzana 'manzana)
+;; Result: #t
+
+(eq? 'manzana 'pera)
+;; Result: #f
+
+(define (segundo l) (car (cdr l)))
+
+(segundo '(1 2 3))
+;; Result: 2
+
+;;; Símbolos dentro de listas citadas son los mismos objetos que los citados sueltos
+(eq? (car '(rojo verde)) 'rojo)
+;; Result: #t
+
+(define (longitud l)
+  (let loop ((l l) (n 0))
+    (if (null? l)
+        n
+        (loop (cdr l) (+ n 1)))))
+
+(longitud '(a "b" (c d) 4 #f))
+;; Result: 5
+
+(string? "hola")
+;; Result: #t
+
+(car '(123456789012345678901234567890))
+;; Result: 123456789012345678901234567890
+
+;;; Pares con punto: la cola citada es el último cdr
+(cdr '(1 . 2))
+;; Result: 2
+
+(pair? (cdr '(1 . 2)))
+;; Result: #f
+
+(cdr (car (cdr '(a (b . 7)))))
+;; Result: 7
@@ -0,0 +1,89 @@
+;;; NIVEL 12: Tablas Hash
+;;; Direccionamiento abierto (Robin Hood) en el runtime; el hash de fixnums
+;;; y símbolos se calcula en línea.
+
+(define (contar-cuadrados n)
+  (let ((t (make-hash-table)))
+    (do ((i 0 (+ i 1))) ((= i n) (hash-table-size t))
+      (hash-table-set! t i (* i i)))))
+
+(contar-cuadrados 1000)
+;; Result: 1000
+
+(define (cuadrado-de n k)
+  (let ((t (make-hash-table)))
+    (do ((i 0 (+ i 1))) ((= i n) (hash-table-ref t k))
+      (hash-table-set! t i (* i i)))))
+
+(cuadrado-de 1000 777)
+;; Result: 603729
+
+;;; Claves simbólicas (internadas), strings y bignums
+(define (precio fruta)
+  (let ((t (make-hash-table)))
+    (hash-table-set! t 'manzana 3)
+    (hash-table-set! t 'pera 5)
+    (hash-table-set! t "kiwi" 8)
+    (hash-table-set! t 123456789012345678901234567890 13)
+    (hash-table-ref/default t fruta 0)))
+
+(precio 'pera)
+;; Result: 5
+
+(precio "kiwi")
+;; Result: 8
+
+(precio 123456789012345678901234567890)
+;; Result: 13
+
+(precio 'uva)
+;; Result: 0
+
+;;; Sobrescribir, borrar y consultar
+(define (borrar-pares n)
+  (let ((t (make-hash-table)))
+    (do ((i 0 (+ i 1))) ((= i n))
+      (hash-table-set! t i #t))
+    (do ((i 0 (+ i 2))) ((> i n))
+      (hash-table-delete! t i))
+    (hash-table-set! t 1 'uno)
+    (if (hash-table-contains? t 4)
+        -1
+        (hash-table-size t))))
+
+(borrar-pares 10000)
+;; Result: 5000
+
+(define (tiene? k)
+  (let ((t (make-hash-table)))
+    (hash-table-set! t 'a 1)
+    (hash-table-contains? t k)))
+
+(tiene? 'a)
+;; Result: #t
+
+(tiene? 'b)
+;; Result: #f
+
+(hash-table? (make-hash-table))
+;; Result: #t
+
+(hash-table? '(1 2))
+;; Result: #f
+
+;;; Claves flonum comparadas como eqv?: NaN se encuentra, 0.0 y -0.0 son distintas
+(define (clave-flonum k)
+  (let ((t (make-hash-table))
+        (nan (/ 0.0 0.0)))
+    (hash-table-set! t 0.0 1)
+    (hash-table-set! t nan 2)
+    (hash-table-ref/default t (if (eq? k 'nan) nan k) 0)))
+
+(clave-flonum 'nan)
+;; Result: 2
+
+(clave-flonum 0.0)
+;; Result: 1
+
+(clave-flonum -0.0)
+;; Result: 0
@@ -0,0 +1,121 @@
+;;; NIVEL 7: Ligaduras Locales y Bucles (let / let* / letrec / do)
+;;; Prueba ligaduras locales como valores SSA y let con nombre / do como bucles nativos.
+
+(let ((x 2) (y 3))
+  (* x y))
+;; Result: 6
+
+(let* ((x 2) (y (+ x 1)))
+  (* x y))
+;; Result: 6
+
+(begin 1 2 3)
+;; Result: 3
+
+;;; let con nombre en posición de cola: bucle con nodos phi
+(define (suma-hasta n)
+  (let loop ((i 0) (acc 0))
+    (if (> i n)
+        acc
+        (loop (+ i 1) (+ acc i)))))
+
+(suma-hasta 100)
+;; Result: 5050
+
+;;; Bucles anidados
+(define (tabla n)
+  (let filas ((i 1) (total 0))
+    (if (> i n)
+        total
+        (filas (+ i 1)
+               (let cols ((j 1) (acc total))
+                 (if (> j n)
+                     acc
+                     (cols (+ j 1) (+ acc (* i j)))))))))
+
+(tabla 4)
+;; Result: 100
+
+(define (factorial-do n)
+  (do ((i 1 (+ i 1))
+       (acc 1 (* acc i)))
+      ((> i n) acc)))
+
+(factorial-do 10)
+;; Result: 3628800
+
+;;; let con nombre en posición no-cola: se eleva a una función auxiliar
+(define (profundidad n)
+  (let rec ((k n))
+    (if (< k 1)
+        0
+        (+ 1 (rec (- k 1))))))
+
+(profundidad 7)
+;; Result: 7
+
+(define (par? n)
+  (letrec ((es-par (lambda (k) (if (= k 0) 1 (es-impar (- k 1)))))
+           (es-impar (lambda (k) (if (= k 0) 0 (es-par (- k 1))))))
+    (es-par n)))
+
+(par? 10)
+;; Result: 1
+
+;;; Listas de ligaduras vacías: `let*` y `letrec` no se confunden con un let con nombre
+(let* () (* 2 3))
+;; Result: 6
+
+(define (rec x) x)
+
+(letrec () (rec 5))
+;; Result: 5
+
+;;; Definiciones internas en el cuerpo de let, let* y let con nombre
+(define (escala n)
+  (let ((k 2))
+    (define (por-k x) (* x k))
+    (por-k n)))
+
+(escala 21)
+;; Result: 42
+
+(define (escala* n)
+  (let* ((k 2) (m (+ k 1)))
+    (define (por-m x) (* x m))
+    (por-m n)))
+
+(escala* 5)
+;; Result: 15
+
+(define (suma-cuadrados n)
+  (let loop ((i 0) (acc 0))
+    (define (cuadrado x) (* x x))
+    (if (> i n) acc (loop (+ i 1) (+ acc (cuadrado i))))))
+
+(suma-cuadrados 3)
+;; Result: 14
+
+;;; Un let con nombre interno que no es bucle se eleva; el externo también
+(define (anidado n)
+  (let externo ((i 0))
+    (let interno ((j 0))
+      (if (< j 2)
+          (+ 1 (interno (+ j 1)))
+          (if (< i n) (externo (+ i 1)) i)))))
+
+(anidado 3)
+;; Result: 11
+
+;;; Bucle interno en posición de cola cuyas salidas saltan al bucle externo
+(define (triangular n)
+  (let outer ((i 0) (acc 0))
+    (if (< i n)
+        (let inner ((j 0) (a acc))
+          (if (< j i)
+              (inner (+ j 1) (+ a 1))
+              (outer (+ i 1) a)))
+        acc)))
+
+(triangular 5)
+;; Result: 10
@@ -0,0 +1,57 @@
+;;; NIVEL 8: Funciones Anidadas (Lambda Lifting)
+;;; Prueba la captura de variables libres en auxiliares anidadas.
+
+(define (factorial-tco n)
+  (define (iter producto contador)
+    (if (> contador n)
+        producto
+        (iter (* contador producto) (+ contador 1))))
+  (iter 1 1))
+
+(factorial-tco 10)
+;; Result: 3628800
+
+;;; Auxiliares hermanas: 'pasos' llama a 'paso', que captura 'k';
+;;; 'pasos' también debe recibir 'k'. 'doble' es global y no se captura.
+(define (escalar n k)
+  (define (paso x) (doble (* x k)))
+  (define (pasos i acc)
+    (if (> i n)
+        acc
+        (pasos (+ i 1) (+ acc (paso i)))))
+  (pasos 1 0))
+
+(define (doble x) (* 2 x))
+
+(escalar 4 3)
+;; Result: 60
+
+;;; Auxiliar anidada dentro de otra auxiliar
+(define (externa a)
+  (define (media b)
+    (define (interna c) (+ a (+ b c)))
+    (interna 1))
+  (media 10))
+
+(externa 100)
+;; Result: 111
+
+;;; Una auxiliar que redefine el nombre capturado por su hermana:
+;;; 'b' recibe la 'k' de 'sombra' en un parámetro propio y la reenvía a 'a'.
+(define (sombra k)
+  (define (a x) (+ x k))
+  (define (b k) (a k))
+  (b 5))
+
+(sombra 100)
+;; Result: 105
+
+(define (sombra-anidada k)
+  (define (a x) (+ x k))
+  (define (b k)
+    (define (c) (a 1))
+    (c))
+  (b 5))
+
+(sombra-anidada 100)
+;; Result: 101
@@ -0,0 +1,18 @@
+;;; NIVEL 9: Eliminación de Definiciones Muertas (Tree Shaking)
+;;; Las funciones inalcanzables no se compilan: 'rota' llama a una función
+;;; inexistente y solo compila si se elimina antes de generar código.
+
+(define (rota x)
+  (funcion-inexistente x))
+
+(define (usa-rota y)
+  (rota y))
+
+(define (cuadrado n) (* n n))
+
+(define (suma-cuadrados a b)
+  (define (aux k) (cuadrado k))
+  (+ (aux a) (aux b)))
+
+(suma-cuadrados 3 4)
+;; Result: 25
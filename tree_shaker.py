@@ -0,0 +1,82 @@
+from ast_nodes import *
+
+class TreeShaker:
+    """
+    Drops top-level function definitions that are unreachable from the program's
+    top-level expressions, so CodeGen never registers or compiles them.
+    Runs after LambdaLifter, so lifted helpers are shaken like any other function.
+    """
+    def __init__(self):
+        self.removed = []  # names of dropped definitions, in program order
+
+    def shake(self, ast):
+        if not isinstance(ast, Program):
+            return ast
+
+        functions = {}
+        roots = []
+        for expr in ast.expressions:
+            if isinstance(expr, Define) and isinstance(expr.value, Lambda):
+                functions[expr.target.name] = expr
+            else:
+                # Top-level expressions and variable definitions always run.
+                roots.append(expr)
+
+        # Walk the call graph from the roots
+        reached = set()
+        worklist = []
+        for root in roots:
+            self._references(root, worklist)
+        while worklist:
+            name = worklist.pop()
+            if name in reached or name not in functions:
+                continue
+            reached.add(name)
+            for body_expr in functions[name].value.body:
+                self._references(body_expr, worklist)
+
+        kept = []
+        for expr in ast.expressions:
+            if isinstance(expr, Define) and isinstance(expr.value, Lambda) and expr.target.name not in reached:
+                self.removed.append(expr.target.name)
+            else:
+                kept.append(expr)
+        return Program(expressions=kept)
+
+    def report(self):
+        if not self.removed:
+            return "Tree shaking: no unreachable definitions"
+        return f"Tree shaking: removed {len(self.removed)} unreachable definition(s): {', '.join(self.removed)}"
+
+    def _references(self, node, out):
+        # Collect every symbol that may name a global function. Local variables
+        # that shadow a global only make the result conservative.
+        if isinstance(node, Symbol):
+            out.append(node.name)
+        elif isinstance(node, LispList):
+            for e in node.elements:
+                self._references(e, out)
+        elif isinstance(node, If):
+            self._references(node.test, out)
+            self._references(node.consequent, out)
+            if node.alternate is not None:
+                self._references(node.alternate, out)
+        elif isinstance(node, Define):
+            self._references(node.value, out)
+        elif isinstance(node, (Lambda, Begin)):
+            for e in node.body:
+                self._references(e, out)
+        elif isinstance(node, (Let, LetStar, Letrec)):
+            for _, init in node.bindings:
+                self._references(init, out)
+            for e in node.body:
+                self._references(e, out)
+        elif isinstance(node, Do):
+            for _, init, step in node.specs:
+                self._references(init, out)
+                if step is not None:
+                    self._references(step, out)
+            self._references(node.test, out)
+            for e in node.result + node.commands:
+                self._references(e, out)
+        # Quoted data and literals reference nothing